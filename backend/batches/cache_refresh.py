@@ -1,5 +1,10 @@
 from celery import Celery
+from celery.schedules import crontab
+from kombu import Queue
 from ..src.data_loader import DataLoader
+from ..src.fundamentals import FundamentalsIndex
+from ..src.refresh_plan import (QUEUES, DEFAULT_CHUNK_SIZE, RefreshProgress, function_queue, new_job_id,
+                                plan_refresh, request_params)
 from dotenv import load_dotenv
 import os
 
@@ -7,40 +12,168 @@ load_dotenv()
 
 app = Celery('tasks', broker='redis://localhost:6379/0')
 
+# Quotes and watchlist tickers go to mf.hot, ahead of time series and fundamentals; start a dedicated
+# worker for it with `celery -A backend.batches.cache_refresh worker -Q mf.hot`
+app.conf.task_queues = [Queue(name) for name in QUEUES]
+app.conf.task_default_queue = function_queue("TIME_SERIES_DAILY")
+app.conf.broker_transport_options = {"priority_steps": list(range(10)), "queue_order_strategy": "priority"}
+# Chunks are acknowledged once done, and redelivered if the worker dies, one at a time per worker
+app.conf.task_acks_late = True
+app.conf.task_reject_on_worker_lost = True
+app.conf.worker_prefetch_multiplier = 1
+
 loader = DataLoader(api_key=os.environ.get("ALPHA_VANTAGE_API_KEY"))
+# Screening rows are recomputed whenever an OVERVIEW or INCOME_STATEMENT refresh lands
+fundamentals = FundamentalsIndex(loader)
+FUNDAMENTALS_FUNCTIONS = ("OVERVIEW", "INCOME_STATEMENT")
+
+def _symbols_from_env(name: str) -> list:
+    return [symbol for symbol in os.environ.get(name, "").split(",") if symbol.strip()]
 
-# Celery tasks
+# Celery tasks. They only return small status records (see DataLoader.warm): the payloads are written
+# to the Redis cache directly and never pass through the broker or the result backend.
 @app.task
 def refresh_stock_price(symbol: str):
     """
     Fetch and cache the latest stock price for a given symbol.
     """
-    return loader.get_stock_price(symbol)
+    return loader.warm([request_params("GLOBAL_QUOTE", symbol)])[0]
 
 @app.task
 def refresh_company_overview(symbol: str):
     """
     Fetch and cache fundamental company data such as market cap, EPS, and description.
     """
-    return loader.get_company_overview(symbol)
+    status = loader.warm([request_params("OVERVIEW", symbol)])[0]
+    fundamentals.refresh([symbol])
+    return status
 
 @app.task
 def refresh_sector_performance():
     """
     Fetch and cache sector performance data.
     """
-    return loader.get_sector_performance()
+    return loader.warm([request_params("SECTOR")])[0]
 
 @app.task
 def refresh_income_statement(symbol: str):
     """
     Fetch and cache income statement data.
     """
-    return loader.get_income_statement(symbol)
+    status = loader.warm([request_params("INCOME_STATEMENT", symbol)])[0]
+    fundamentals.refresh([symbol])
+    return status
 
 @app.task
 def refresh_bulk_data(symbols: list, function="TIME_SERIES_QUARTERLY_ADJUSTED"):
     """
     Fetch and cache bulk financial data (default: quarterly adjusted time series) for multiple stocks.
     """
-    return loader.get_bulk_data(symbols, function)
\ No newline at end of file
+    statuses = loader.warm([request_params(function, symbol) for symbol in symbols])
+    if function in FUNDAMENTALS_FUNCTIONS:
+        fundamentals.refresh(symbols)
+    return statuses
+
+@app.task
+def refresh_cache_entry(params: dict):
+    """
+    Fetch and cache the data of a single request, regardless of what is cached (used to revalidate stale entries).
+    """
+    status = loader.warm([params], force=True)[0]
+    if params["function"] in FUNDAMENTALS_FUNCTIONS:
+        fundamentals.refresh([params["symbol"]])
+    return status
+
+@app.task
+def refresh_universe(function: str, symbols: list = None, watchlist: list = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, job_id: str = None):
+    """
+    Refresh a function for a whole universe of symbols, split into chunks fanned out to the workers.
+
+    Symbols default to the MF_UNIVERSE environment variable and the watchlist to MF_WATCHLIST (both
+    comma-separated); watchlist symbols are refreshed first, on the hot queue. Every API call still
+    waits on the rate budget shared through Redis.
+
+    Every run is a new job (unless job_id is given) that refreshes all the symbols, even if the function
+    was already refreshed the same day. The job remembers which symbols are done, so a chunk redelivered
+    after a worker restart only refreshes the rest.
+
+    Returns:
+        str: The job identifier, to be passed to refresh_progress.
+    """
+    symbols = symbols if symbols is not None else _symbols_from_env("MF_UNIVERSE")
+    watchlist = watchlist if watchlist is not None else _symbols_from_env("MF_WATCHLIST")
+    job_id = job_id or new_job_id(function)
+
+    chunks = plan_refresh(symbols, function, watchlist, chunk_size)
+    RefreshProgress(loader.redis, job_id).start(sum(len(chunk.symbols) for chunk in chunks))
+
+    for chunk in chunks:
+        refresh_chunk.apply_async(args=(job_id, chunk.function, chunk.symbols), queue=chunk.queue,
+                                  priority=chunk.priority)
+    return job_id
+
+@app.task(acks_late=True, reject_on_worker_lost=True)
+def refresh_chunk(job_id: str, function: str, symbols: list):
+    """
+    Refresh a chunk of a refresh_universe job, skipping the symbols already done.
+
+    Returns:
+        list: The status record of each refreshed symbol.
+    """
+    progress = RefreshProgress(loader.redis, job_id)
+    statuses = []
+    pending = progress.pending(symbols)
+
+    for symbol in pending:
+        statuses.extend(loader.warm([request_params(function, symbol)], force=True))
+        # Recorded per symbol, so a redelivered chunk resumes where the lost worker stopped
+        progress.mark_done([symbol])
+
+    if function in FUNDAMENTALS_FUNCTIONS and statuses:
+        fundamentals.refresh(pending)
+    return statuses
+
+@app.task
+def refresh_progress(job_id: str) -> dict:
+    """
+    Get the number of refreshed symbols of a refresh_universe job.
+    """
+    return RefreshProgress(loader.redis, job_id).status()
+
+def enqueue_revalidation(params: dict):
+    """
+    Queue a refresh of a stale cache entry. Pass as DataLoader(revalidate=...) to enable stale-while-revalidate.
+    """
+    refresh_cache_entry.delay(params)
+
+# Warm the cache before the US market opens (9:30 New York time)
+app.conf.timezone = "America/New_York"
+app.conf.beat_schedule = {
+    "refresh-daily-series": {
+        "task": refresh_universe.name,
+        "schedule": crontab(hour=6, minute=0, day_of_week="mon-fri"),
+        "args": ("TIME_SERIES_DAILY",),
+    },
+    "refresh-sector-performance": {
+        "task": refresh_sector_performance.name,
+        "schedule": crontab(hour=9, minute=0, day_of_week="mon-fri"),
+        "options": {"queue": function_queue("SECTOR")},
+    },
+    "refresh-quotes": {
+        "task": refresh_universe.name,
+        "schedule": crontab(hour=9, minute=15, day_of_week="mon-fri"),
+        "args": ("GLOBAL_QUOTE",),
+        "options": {"queue": function_queue("GLOBAL_QUOTE")},
+    },
+    "refresh-overviews": {
+        "task": refresh_universe.name,
+        "schedule": crontab(hour=4, minute=0, day_of_week="sun"),
+        "args": ("OVERVIEW",),
+    },
+    "refresh-income-statements": {
+        "task": refresh_universe.name,
+        "schedule": crontab(hour=5, minute=0, day_of_week="sun"),
+        "args": ("INCOME_STATEMENT",),
+    },
+}
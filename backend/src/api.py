@@ -0,0 +1,300 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from dotenv import load_dotenv
+
+from .cache_keys import normalize_symbol
+from .charts import ChartSeries
+from .data_loader import DataLoader
+from .data_processor import DataProcessor
+from .lru_cache import LRUCache
+
+API_PREFIX = "/api"
+# Upper bound of symbols per batched request, so one request cannot spend the whole API budget
+MAX_SYMBOLS = 100
+# Upper bound of the points of a downsampled series
+MAX_POINTS = 5000
+# Smaller bodies are sent uncompressed: gzip would not make them meaningfully smaller
+GZIP_MIN_SIZE = 1024
+DOWNSAMPLING_METHODS = ("lttb", "ohlc")
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(Exception):
+    """
+    Invalid request parameters; answered with a 400 and the message. Any other failure is a 500.
+    """
+
+
+class CachedResponse:
+    """
+    A JSON response body kept in the response cache, with its ETag and (once requested) its gzipped form.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+        self._gzipped = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class ApiServer:
+    """
+    Async HTTP API serving DataLoader and DataProcessor results to the frontend.
+
+    Every data endpoint takes a comma-separated list of symbols, so a view needs one round trip instead
+    of one per ticker. Processed responses are kept in a small in-memory cache keyed on the endpoint and
+    its normalized query, carry an ETag (a matching If-None-Match gets a 304 without a body) and are
+    gzipped when the client accepts it.
+
+    Endpoints (all GET, under /api):
+        /quotes?symbols=AAPL,MSFT
+        /overviews?symbols=AAPL,MSFT&fields=MarketCapitalization,PERatio
+        /series?symbols=AAPL,MSFT&function=TIME_SERIES_DAILY&start=2024-01-01&end=2024-06-30&window=20&columns=Close
+                &points=500&method=lttb   (a symbol without a series gets {"error": ...})
+        /charts?symbols=AAPL,MSFT&start=2020-01-01&points=500&method=ohlc   (from the history store)
+        /sectors
+        /health
+    """
+
+    def __init__(self, loader: DataLoader, processor: DataProcessor = None, charts: ChartSeries = None,
+                 cache_size: int = 256, cache_ttl: float = 60, cors_origin: str = "*"):
+        """
+        Initialize the ApiServer.
+
+        Args:
+            loader (DataLoader): The loader serving the Alpha Vantage data.
+            processor (DataProcessor): The processor used for the time series (default: DataProcessor()).
+            charts (ChartSeries): The chart series served by /charts (default: no /charts endpoint).
+            cache_size (int): The number of responses kept in the response cache (0 disables it).
+            cache_ttl (float): How long, in seconds, a response is served from the response cache.
+            cors_origin (str): The Access-Control-Allow-Origin sent to browsers (e.g. the Angular dev server).
+        """
+        self.loader = loader
+        self.processor = processor or DataProcessor()
+        self.charts = charts
+        self.response_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+        self.cache_ttl = cache_ttl
+        self.cors_origin = cors_origin
+
+    def create_app(self) -> web.Application:
+        """
+        Build the aiohttp application.
+        """
+        app = web.Application(middlewares=[self._error_middleware])
+        app.router.add_get(f"{API_PREFIX}/health", self.health)
+        app.router.add_get(f"{API_PREFIX}/quotes", self.quotes)
+        app.router.add_get(f"{API_PREFIX}/overviews", self.overviews)
+        app.router.add_get(f"{API_PREFIX}/series", self.series)
+        app.router.add_get(f"{API_PREFIX}/sectors", self.sectors)
+        if self.charts is not None:
+            app.router.add_get(f"{API_PREFIX}/charts", self.chart_series)
+        return app
+
+    @web.middleware
+    async def _error_middleware(self, request: web.Request, handler):
+        try:
+            response = await handler(request)
+        except BadRequest as e:
+            response = web.json_response({"error": str(e)}, status=400)
+        except ConnectionError as e:
+            response = web.json_response({"error": str(e)}, status=502)
+        except web.HTTPException:
+            raise
+        except Exception:
+            logger.exception("Failed to answer %s", request.path_qs)
+            response = web.json_response({"error": "Internal server error"}, status=500)
+
+        response.headers["Access-Control-Allow-Origin"] = self.cors_origin
+        response.headers["Access-Control-Expose-Headers"] = "ETag"
+        return response
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def quotes(self, request: web.Request) -> web.Response:
+        symbols = self._symbols(request)
+        return await self._respond(request, ("quotes", tuple(symbols)), lambda: self._quotes(symbols))
+
+    async def overviews(self, request: web.Request) -> web.Response:
+        symbols = self._symbols(request)
+        fields = self._list(request, "fields")
+        return await self._respond(request, ("overviews", tuple(symbols), tuple(fields)),
+                                   lambda: self._overviews(symbols, fields))
+
+    async def series(self, request: web.Request) -> web.Response:
+        symbols = self._symbols(request)
+        function = request.query.get("function", "TIME_SERIES_DAILY").upper()
+        if not function.startswith("TIME_SERIES"):
+            raise BadRequest(f"Unsupported time series function: {function}")
+        start, end = self._dates(request)
+        window = self._int(request, "window", 20)
+        if window < 1:
+            raise BadRequest("window must be at least 1.")
+        columns = self._list(request, "columns")
+        points, method = self._resolution(request)
+
+        key = ("series", tuple(symbols), function, start, end, window, tuple(columns), points, method)
+        return await self._respond(request, key, lambda: self._series(symbols, function, start, end, window, columns,
+                                                                      points, method))
+
+    async def chart_series(self, request: web.Request) -> web.Response:
+        symbols = self._symbols(request)
+        start, end = self._dates(request)
+        columns = self._list(request, "columns")
+        points, method = self._resolution(request)
+        points = points or 500
+
+        def compute():
+            series = self.charts.get_many(symbols, start, end, points, method, columns or None)
+            return {symbol: self._columnar(df) for symbol, df in series.items()}
+
+        return await self._respond(request, ("charts", tuple(symbols), start, end, tuple(columns), points, method),
+                                   compute)
+
+    async def sectors(self, request: web.Request) -> web.Response:
+        return await self._respond(request, ("sectors",), self.loader.get_sector_performance)
+
+    async def _respond(self, request: web.Request, key: tuple, compute) -> web.Response:
+        """
+        Private method to answer from the response cache, computing (in a worker thread) and caching the result on a miss.
+        """
+        cached = self.response_cache.get(key) if self.response_cache is not None else None
+        if cached is None:
+            result = await asyncio.get_running_loop().run_in_executor(None, compute)
+            cached = CachedResponse(json.dumps(result, separators=(",", ":"), allow_nan=False).encode())
+            if self.response_cache is not None:
+                self.response_cache.set(key, cached)
+
+        headers = {"ETag": cached.etag, "Cache-Control": f"private, max-age={int(self.cache_ttl)}",
+                   "Vary": "Accept-Encoding"}
+        etags = self._etags(request.headers.get("If-None-Match", ""))
+        if cached.etag in etags or "*" in etags:
+            return web.Response(status=304, headers=headers)
+
+        body = cached.body
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = cached.gzipped
+            headers["Content-Encoding"] = "gzip"
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    @staticmethod
+    def _etags(if_none_match: str) -> set:
+        etags = {tag.strip() for tag in if_none_match.split(",") if tag.strip()}
+        # Weak comparison: W/"x" matches "x"
+        return etags | {f"W/{tag}" for tag in etags if not tag.startswith("W/")}
+
+    @staticmethod
+    def _list(request: web.Request, name: str) -> list:
+        return [value.strip() for value in request.query.get(name, "").split(",") if value.strip()]
+
+    @staticmethod
+    def _int(request: web.Request, name: str, default: int = None) -> int | None:
+        if name not in request.query:
+            return default
+        try:
+            return int(request.query[name])
+        except ValueError:
+            raise BadRequest(f"{name} must be an integer.") from None
+
+    @staticmethod
+    def _dates(request: web.Request) -> tuple:
+        dates = request.query.get("start"), request.query.get("end")
+        for date in dates:
+            try:
+                if date is not None:
+                    pd.Timestamp(date)
+            except ValueError:
+                raise BadRequest(f"Invalid date: {date}") from None
+        return dates
+
+    def _resolution(self, request: web.Request) -> tuple:
+        points = self._int(request, "points")
+        if points is not None and not 3 <= points <= MAX_POINTS:
+            raise BadRequest(f"points must be between 3 and {MAX_POINTS}.")
+        method = request.query.get("method", "lttb").lower()
+        if method not in DOWNSAMPLING_METHODS:
+            raise BadRequest(f"Unknown downsampling method: {method}")
+        return points, method
+
+    def _symbols(self, request: web.Request) -> list:
+        symbols = sorted({normalize_symbol(symbol) for symbol in self._list(request, "symbols")})
+        if not symbols:
+            raise BadRequest("At least one symbol is required.")
+        if len(symbols) > MAX_SYMBOLS:
+            raise BadRequest(f"At most {MAX_SYMBOLS} symbols are allowed per request.")
+        return symbols
+
+    def _quotes(self, symbols: list) -> dict:
+        payloads = self.loader.get_many([{"function": "GLOBAL_QUOTE", "symbol": symbol} for symbol in symbols])
+        # "05. price" -> "price"
+        return {symbol: {key.split(". ", 1)[-1]: value for key, value in payload.get("Global Quote", {}).items()}
+                for symbol, payload in zip(symbols, payloads)}
+
+    def _overviews(self, symbols: list, fields: list) -> dict:
+        payloads = self.loader.get_many([{"function": "OVERVIEW", "symbol": symbol} for symbol in symbols])
+        if fields:
+            payloads = [{field: payload.get(field) for field in fields} for payload in payloads]
+        return dict(zip(symbols, payloads))
+
+    def _series(self, symbols: list, function: str, start: str, end: str, window: int, columns: list,
+                points: int = None, method: str = "lttb") -> dict:
+        params_list = [{"function": function, "symbol": symbol, "outputsize": "full"} for symbol in symbols]
+        result = {}
+        for symbol, payload in zip(symbols, self.loader.get_many(params_list)):
+            try:
+                df = self.processor.parse_time_series(payload)
+            except ValueError as e:
+                # No series for this symbol (e.g. an unknown ticker): report it without failing the others
+                result[symbol] = {"error": payload.get("Error Message") or payload.get("Information") or str(e)}
+                continue
+            df = self.processor.clean_stock_data(df).sort_index()
+            df = self.processor.calculate_returns(df)
+            df = self.processor.calculate_moving_average(df, window=window)
+            if points:
+                df = self.processor.chart_series(df, start, end, points, method)
+            elif start or end:
+                df = self.processor.filter_by_date(df, start or df.index.min(), end or df.index.max())
+            if columns:
+                unknown = [column for column in columns if column not in df.columns]
+                if unknown:
+                    raise BadRequest(f"Unknown columns: {', '.join(unknown)}")
+                df = df[columns]
+            result[symbol] = self._columnar(df)
+        return result
+
+    @staticmethod
+    def _columnar(df: pd.DataFrame) -> dict:
+        """
+        Private method to turn a frame into {"dates": [...], <column>: [...]}, with null for missing values.
+        """
+        result = {"dates": df.index.strftime("%Y-%m-%d").tolist()}
+        for column in df.columns:
+            values = df[column].to_numpy(dtype=float, na_value=np.nan)
+            result[column] = [None if np.isnan(value) else value for value in values.tolist()]
+        return result
+
+
+def main():
+    load_dotenv()
+    loader = DataLoader(api_key=os.environ.get("ALPHA_VANTAGE_API_KEY"),
+                        redis_host=os.environ.get("REDIS_HOST", "localhost"),
+                        local_cache_size=int(os.environ.get("MF_LOCAL_CACHE_SIZE", 1024)))
+    web.run_app(ApiServer(loader, charts=ChartSeries()).create_app(), port=int(os.environ.get("MF_API_PORT", 5000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import json
+import struct
+import time
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every encoded cache entry starts with MAGIC, the format version and the codec id.
+# Version 2 adds the time the entry was stored (a big-endian double, in seconds since the epoch).
+# Entries written before codecs existed are plain JSON text and never start with MAGIC.
+MAGIC = b"MF"
+FORMAT_VERSION = 2
+_STORED_AT = struct.Struct(">d")
+
+
+def _json_dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _json_loads(payload: bytes):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+class CacheCodec:
+    """
+    Base class of the cache encodings. Subclasses set a unique codec_id and implement _dumps/_loads.
+    """
+    codec_id = None
+    name = None
+
+    def encode(self, data, stored_at: float = None) -> bytes:
+        """
+        Encode data for the cache, prefixed with the version tag and the time it was stored.
+
+        Args:
+            data: The JSON-compatible data to encode.
+            stored_at (float): When the data was fetched, in seconds since the epoch (default: now).
+
+        Returns:
+            bytes: The encoded cache entry.
+        """
+        stored_at = time.time() if stored_at is None else stored_at
+        return MAGIC + bytes([FORMAT_VERSION, self.codec_id]) + _STORED_AT.pack(stored_at) + self._dumps(data)
+
+    def _dumps(self, data) -> bytes:
+        raise NotImplementedError
+
+    def _loads(self, payload: bytes):
+        raise NotImplementedError
+
+
+class JSONCodec(CacheCodec):
+    """Uncompressed compact JSON."""
+    codec_id = 0
+    name = "json"
+
+    def _dumps(self, data) -> bytes:
+        return _json_dumps(data)
+
+    def _loads(self, payload: bytes):
+        return _json_loads(payload)
+
+
+class ZlibCodec(CacheCodec):
+    """zlib-compressed JSON, always available."""
+    codec_id = 1
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def _dumps(self, data) -> bytes:
+        return zlib.compress(_json_dumps(data), self.level)
+
+    def _loads(self, payload: bytes):
+        return _json_loads(zlib.decompress(payload))
+
+
+class ZstdCodec(CacheCodec):
+    """zstd-compressed JSON. Requires the zstandard package."""
+    codec_id = 2
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        if zstandard is None:
+            raise ImportError("The zstd cache codec requires the zstandard package.")
+        self.level = level
+
+    def _dumps(self, data) -> bytes:
+        # Compressor objects are not thread-safe, so create one per call
+        return zstandard.ZstdCompressor(level=self.level).compress(_json_dumps(data))
+
+    def _loads(self, payload: bytes):
+        return _json_loads(zstandard.ZstdDecompressor().decompress(payload))
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, ZlibCodec, ZstdCodec)}
+_DECODERS = {}
+
+
+def get_codec(codec: str | CacheCodec = None) -> CacheCodec:
+    """
+    Resolve a codec name (or instance) to a codec instance.
+
+    Args:
+        codec (str or CacheCodec): "json", "zlib" or "zstd". If not provided, zstd is used when
+            the zstandard package is installed, otherwise zlib.
+
+    Returns:
+        CacheCodec: The codec instance.
+    """
+    if isinstance(codec, CacheCodec):
+        return codec
+    if codec is None:
+        codec = "zstd" if zstandard is not None else "zlib"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown cache codec: {codec}")
+    return CODECS[codec]()
+
+
+def decode(raw: bytes):
+    """
+    Decode a cache entry written by any codec, or a legacy plain JSON entry.
+
+    Args:
+        raw (bytes): The raw cache entry.
+
+    Returns:
+        The decoded JSON-compatible data.
+    """
+    return decode_entry(raw)[0]
+
+
+def decode_entry(raw: bytes) -> tuple:
+    """
+    Decode a cache entry written by any codec, or a legacy plain JSON entry, with its storage time.
+
+    Args:
+        raw (bytes): The raw cache entry.
+
+    Returns:
+        tuple: The decoded data and the time it was stored (None for entries older than format version 2).
+    """
+    if not raw.startswith(MAGIC):
+        return _json_loads(raw), None
+
+    version, codec_id = raw[2], raw[3]
+    if version == 1:
+        stored_at, body = None, raw[4:]
+    elif version == 2:
+        stored_at, body = _STORED_AT.unpack_from(raw, 4)[0], raw[4 + _STORED_AT.size:]
+    else:
+        raise ValueError(f"Unsupported cache entry version: {version}")
+
+    if codec_id not in _DECODERS:
+        codec = next((codec for codec in CODECS.values() if codec.codec_id == codec_id), None)
+        if codec is None:
+            raise ValueError(f"Unknown cache codec id: {codec_id}")
+        _DECODERS[codec_id] = codec()
+    return _DECODERS[codec_id]._loads(body), stored_at
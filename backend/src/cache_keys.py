@@ -0,0 +1,82 @@
+import hashlib
+import json
+import re
+
+# Bump KEY_VERSION whenever the key layout or the cached payloads change, to stop reading old entries
+NAMESPACE = "mf"
+KEY_VERSION = 1
+
+# Request parameters that do not change the response
+IGNORED_PARAMS = ("apikey",)
+
+# Suffixes of the markers stored next to the entries: single-flight locks and revalidation markers
+MARKER_SUFFIXES = (":lock", ":revalidating")
+
+_GLOB_SPECIAL = re.compile(r"([*?\[\]\\])")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """
+    Normalize a ticker symbol, so "aapl", " AAPL" and "AAPL" share one cache entry.
+    """
+    return str(symbol).strip().upper()
+
+
+def canonical_params(params: dict) -> dict:
+    """
+    Get the request parameters that identify a response: without the API key or unset values,
+    with the function and symbol normalized and every value as a string.
+    """
+    canonical = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS or value is None or value == "":
+            continue
+        if name == "symbol":
+            value = normalize_symbol(value)
+        elif name == "function":
+            value = str(value).strip().upper()
+        canonical[name] = str(value)
+    return canonical
+
+
+def params_hash(params: dict) -> str:
+    """
+    Get a stable hash of the canonical request parameters, independent of their order.
+    """
+    encoded = json.dumps(canonical_params(params), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def cache_key(params: dict, namespace: str = NAMESPACE) -> str:
+    """
+    Build the cache key of a request:
+
+        <namespace>:v<KEY_VERSION>:<FUNCTION>:<SYMBOL>:<hash of all parameters>
+
+    The function and symbol are spelled out so entries can be found by pattern (see key_pattern);
+    requests without a symbol (e.g. SECTOR) use "-".
+    """
+    canonical = canonical_params(params)
+    return (f"{namespace}:v{KEY_VERSION}:{canonical['function']}:{canonical.get('symbol', '-')}:"
+            f"{params_hash(canonical)}")
+
+
+def key_pattern(function: str = None, symbol: str = None, namespace: str = NAMESPACE) -> str:
+    """
+    Build a SCAN MATCH pattern for the cache keys of a function, a symbol, or both (all keys when neither is given).
+    The pattern also matches the lock and revalidation markers stored next to the entries (see is_marker).
+    """
+    function = "*" if function is None else _escape(str(function).strip().upper())
+    symbol = "*" if symbol is None else _escape(normalize_symbol(symbol))
+    return f"{namespace}:v{KEY_VERSION}:{function}:{symbol}:*"
+
+
+def is_marker(key: str) -> bool:
+    """
+    Check whether a key is a lock or revalidation marker rather than a cache entry.
+    """
+    return key.endswith(MARKER_SUFFIXES)
+
+
+def _escape(value: str) -> str:
+    return _GLOB_SPECIAL.sub(r"\\\1", value)
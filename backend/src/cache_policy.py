@@ -0,0 +1,73 @@
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+class CachePolicy:
+    """
+    How long cached API responses stay fresh, per Alpha Vantage function.
+
+    An entry is fresh for ttl(function) seconds after it was fetched. It is then kept in Redis for
+    another stale_ttl(function) seconds, during which a DataLoader in stale-while-revalidate mode
+    may still serve it while a refresh is queued.
+    """
+
+    DEFAULT_TTLS = {
+        "GLOBAL_QUOTE": 1 * MINUTE,
+        "TIME_SERIES_INTRADAY": 5 * MINUTE,
+        "TIME_SERIES_DAILY": 6 * HOUR,
+        "TIME_SERIES_DAILY_ADJUSTED": 6 * HOUR,
+        "TIME_SERIES_WEEKLY": 1 * DAY,
+        "TIME_SERIES_WEEKLY_ADJUSTED": 1 * DAY,
+        "TIME_SERIES_MONTHLY": 1 * DAY,
+        "TIME_SERIES_MONTHLY_ADJUSTED": 1 * DAY,
+        "TIME_SERIES_QUARTERLY_ADJUSTED": 7 * DAY,
+        "SECTOR": 1 * HOUR,
+        # Fundamentals only change when a new quarterly report is filed
+        "OVERVIEW": 7 * DAY,
+        "INCOME_STATEMENT": 7 * DAY,
+        "BALANCE_SHEET": 7 * DAY,
+        "CASH_FLOW": 7 * DAY,
+        "EARNINGS": 7 * DAY,
+    }
+
+    def __init__(self, ttls: dict = None, default_ttl: int = HOUR, stale_ttls: dict = None,
+                 max_stale_ttl: int = 7 * DAY):
+        """
+        Initialize the CachePolicy.
+
+        Args:
+            ttls (dict): Freshness in seconds per function, overriding DEFAULT_TTLS.
+            default_ttl (int): Freshness in seconds for functions without a TTL (default: 1 hour).
+            stale_ttls (dict): How long stale entries are kept per function (default: as long as they were fresh).
+            max_stale_ttl (int): Upper bound for the default stale window in seconds (default: 7 days).
+        """
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.stale_ttls = stale_ttls or {}
+        self.max_stale_ttl = max_stale_ttl
+
+    def ttl(self, function: str) -> int:
+        """
+        Get how many seconds an entry of the given function stays fresh.
+        """
+        return self.ttls.get(function, self.default_ttl)
+
+    def stale_ttl(self, function: str) -> int:
+        """
+        Get how many seconds an entry of the given function is kept after it went stale.
+        """
+        return self.stale_ttls.get(function, min(self.ttl(function), self.max_stale_ttl))
+
+    def expiry(self, function: str) -> int:
+        """
+        Get the Redis expiry in seconds of an entry of the given function (fresh plus stale window).
+        """
+        return self.ttl(function) + self.stale_ttl(function)
+
+    def is_fresh(self, function: str, stored_at: float, now: float) -> bool:
+        """
+        Check whether an entry stored at stored_at is still fresh at now.
+        Entries without a storage time (written before it was recorded) are fresh until Redis expires them.
+        """
+        return stored_at is None or now - stored_at < self.ttl(function)
@@ -0,0 +1,84 @@
+import pandas as pd
+
+from .data_processor import DataProcessor
+from .history_store import HistoryStore, ParquetHistoryStore, pa
+from .lru_cache import LRUCache
+
+
+class ChartSeries:
+    """
+    Date-windowed, downsampled chart series read from the history store.
+
+    Only the requested date window and columns are read, and the results are cached per
+    (symbol, window, resolution), so the same chart asked for again is served from memory.
+    """
+
+    def __init__(self, store: HistoryStore | ParquetHistoryStore = None, processor: DataProcessor = None,
+                 cache_size: int = 512, cache_ttl: float = 300):
+        """
+        Initialize the ChartSeries.
+
+        Args:
+            store (HistoryStore or ParquetHistoryStore): The store holding the processed history
+                (default: ParquetHistoryStore() when pyarrow is installed, otherwise HistoryStore()).
+            processor (DataProcessor): The processor used to downsample the series (default: DataProcessor()).
+            cache_size (int): The number of series kept in memory.
+            cache_ttl (float): How long, in seconds, a series is kept (the history changes at most once a day).
+        """
+        self.store = store or (ParquetHistoryStore() if pa is not None else HistoryStore())
+        self.processor = processor or DataProcessor()
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def get(self, symbol: str, start_date: str = None, end_date: str = None, points: int = 500,
+            method: str = 'lttb', columns: list = None) -> pd.DataFrame | None:
+        """
+        Get the chart series of a symbol. See DataProcessor.chart_series.
+
+        Args:
+            symbol (str): The symbol.
+            start_date (str): The start date in 'YYYY-MM-DD' format (default: the first stored date).
+            end_date (str): The end date in 'YYYY-MM-DD' format (default: the last stored date).
+            points (int): The target number of rows (default: 500).
+            method (str): 'lttb' or 'ohlc' (default: 'lttb').
+            columns (list): The columns to return (default: all).
+
+        Returns:
+            pd.DataFrame: At most points rows, or None if nothing is stored for the symbol.
+                The frame is shared with other callers and must not be modified.
+        """
+        key = (symbol, start_date, end_date, points, method, tuple(columns) if columns else None)
+        series = self.cache.get(key)
+        if series is not None:
+            return series
+
+        df = self._read(symbol, start_date, end_date, columns, method)
+        if df is None:
+            return None
+
+        series = self.processor.chart_series(df, start_date, end_date, points, method)
+        if columns:
+            series = series[columns]
+        self.cache.set(key, series)
+        return series
+
+    def get_many(self, symbols: list, start_date: str = None, end_date: str = None, points: int = 500,
+                 method: str = 'lttb', columns: list = None) -> dict:
+        """
+        Get the chart series of several symbols. See get.
+
+        Returns:
+            dict: The series per symbol, for the symbols that have a stored history.
+        """
+        series = {symbol: self.get(symbol, start_date, end_date, points, method, columns) for symbol in symbols}
+        return {symbol: df for symbol, df in series.items() if df is not None}
+
+    def _read(self, symbol: str, start_date: str, end_date: str, columns: list, method: str) -> pd.DataFrame | None:
+        """
+        Private method to read a date window of a history, pushing the window and columns down to the store.
+        """
+        if isinstance(self.store, ParquetHistoryStore):
+            # LTTB selects the rows on Close; OHLC bars are built from whatever columns are stored
+            needed = list(dict.fromkeys(columns + ['Close'])) if columns and method == 'lttb' else None
+            return self.store.read(symbol, start_date, end_date, needed)
+
+        return self.store.load(symbol)
@@ -6,9 +6,11 @@ static_dir = os.path.join(app_dir, 'static')
 data_dir = os.path.join(app_dir, 'data')
 temp_dir = os.path.join(data_dir, 'temp')
 output_dir = os.path.join(data_dir, 'output')
+history_dir = os.path.join(data_dir, 'history')
+parquet_history_dir = os.path.join(data_dir, 'history_parquet')
 
 # Create dirs if they do not exist
-for dir in [data_dir, temp_dir, output_dir]:
+for dir in [data_dir, temp_dir, output_dir, history_dir, parquet_history_dir]:
     if not os.path.exists(dir):
         os.makedirs(dir)
 
@@ -2,76 +2,531 @@ import requests
 import time
 import os
 import redis
-import json
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from .cache_codec import get_codec, decode_entry as decode_cache_entry
+from .cache_keys import cache_key, is_marker, key_pattern
+from .cache_policy import CachePolicy
+from .lru_cache import LRUCache
+from .metrics import metrics
+from .rate_limiter import RateLimiter
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 class DataLoader:
     BASE_URL = "https://www.alphavantage.co/query"
 
-    def __init__(self, api_key: str = None, redis_host: str = 'localhost', redis_port: int = 6379):
+    MAX_RETRIES = 5
+    MAX_CONCURRENCY = 16
+    CACHE_WRITE_BATCH = 50
+    REVALIDATION_LOCK_TTL = 60
+    INVALIDATION_CHANNEL = "mf:cache:invalidate"
+    INVALIDATION_SCAN_COUNT = 1000
+
+    def __init__(self, api_key: str = None, redis_host: str = 'localhost', redis_port: int = 6379,
+                 requests_per_minute: float = None, redis_client: redis.Redis = None, base_url: str = None,
+                 cache_codec: str = None, cache_policy: CachePolicy = None, revalidate=None,
+                 local_cache_size: int = 0, local_cache_ttl: float = 30):
         """
         Initialize the DataLoader with an API key and Redis connection.
+
+        The API request budget is shared through Redis by every DataLoader (and Celery worker)
+        using the same Redis server. It defaults to the ALPHA_VANTAGE_REQUESTS_PER_MINUTE
+        environment variable, or 5 requests per minute (the free tier limit).
+
+        Cache entries are written with cache_codec ("json", "zlib" or "zstd", default: the
+        MF_CACHE_CODEC environment variable, or zstd when installed). Entries written by any
+        codec, and plain JSON entries from older versions, can always be read back.
+
+        How long entries stay fresh is decided per function by cache_policy (default: CachePolicy()).
+        Passing a revalidate callable turns on stale-while-revalidate mode: stale entries are served
+        immediately and revalidate(params) is called to queue a refresh, e.g.
+        batches.cache_refresh.enqueue_revalidation.
+
+        With local_cache_size > 0, an in-process LRU cache of that many entries (each kept for at most
+        local_cache_ttl seconds) is checked before Redis. Entries are dropped from it whenever any
+        DataLoader sharing the Redis server (e.g. a Celery refresh task) writes new data for them.
+        Data served from it is shared between callers and must not be modified.
         """
         self.api_key = api_key or os.getenv("ALPHA_VANTAGE_API_KEY")
         if not self.api_key:
             raise ValueError("Alpha Vantage API key is required.")
 
-        self.redis = redis.Redis(host=redis_host, port=redis_port, db=0)
+        self.redis = redis_client or redis.Redis(host=redis_host, port=redis_port, db=0)
+
+        requests_per_minute = requests_per_minute or float(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_MINUTE", 5))
+        self.rate_limiter = RateLimiter(self.redis, requests_per_minute=requests_per_minute)
+        self.cache_codec = get_codec(cache_codec or os.getenv("MF_CACHE_CODEC"))
+        self.cache_policy = cache_policy or CachePolicy()
+        self.revalidate = revalidate
+
+        self.local_cache = None
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_thread = None
+        if local_cache_size:
+            self.local_cache = LRUCache(maxsize=local_cache_size, ttl=local_cache_ttl)
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._handle_invalidation})
+            self._invalidation_thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+        # Concurrent misses on the same key (in this process or any other) trigger a single API call
+        self.single_flight = SingleFlight(self.redis)
+
+        # One pooled HTTP session, reused by every request (including concurrent bulk fetches)
+        self.base_url = base_url or self.BASE_URL
+        self.session = requests.Session()
+        self.session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_CONCURRENCY))
 
     def _fetch_data(self, params: dict) -> dict:
         """
         Private method to handle API requests with caching and rate limit management.
         """
         cache_key = self._generate_cache_key(params)
-        cached_data = self.redis.get(cache_key)
+        cached_data = self.cache_get_many([params])[0]
 
         # Return cached data if available
-        if cached_data:
-            print(f"Cache hit for {cache_key}")
-            return json.loads(cached_data)
+        if cached_data is not None:
+            logger.debug("Cache hit for %s", cache_key)
+            return cached_data
 
-        print(f"Cache miss for {cache_key}, fetching from API...")
-        params["apikey"] = self.api_key
-        response = requests.get(self.BASE_URL, params=params)
+        logger.debug("Cache miss for %s, fetching from API...", cache_key)
+        return self._fetch_coalesced(params)
 
-        if response.status_code != 200:
-            raise ConnectionError(f"API request failed: {response.status_code}")
+    def _fetch_coalesced(self, params: dict) -> dict:
+        """
+        Private method to fetch and cache data, sharing one API call among concurrent misses on the same key.
+        """
+        return self.single_flight.do(
+            self._generate_cache_key(params),
+            fetch=lambda: self._fetch_and_cache(params),
+            load=lambda: self.cache_get_many([params])[0]
+        )
 
-        data = response.json()
+    def _fetch_and_cache(self, params: dict) -> dict:
+        """
+        Private method to fetch data from the API and store it in the cache.
+        """
+        data = self._request_api(params)
+        self.cache_set_many([(params, data)])
+        return data
+
+    def refresh(self, params: dict) -> dict:
+        """
+        Fetch data from the API and store it in the cache, regardless of what is cached.
 
-        # Check for rate limit message
-        if "Note" in data:
-            print("Rate limit exceeded, waiting for 60 seconds...")
-            time.sleep(60)
-            return self._fetch_data(params)  # Retry after waiting
+        Args:
+            params (dict): The request parameters.
 
-        # Cache the data for 1 hour (3600 seconds)
-        self.redis.setex(cache_key, 3600, json.dumps(data))
-        return data
+        Returns:
+            dict: The fetched data.
+        """
+        return self._fetch_and_cache(params)
+
+    def get_many(self, params_list: list) -> list:
+        """
+        Fetch the data of several requests: the cache is read for all of them in one round trip and
+        the misses are fetched concurrently (at most the rate limiter's burst size at a time).
+
+        Args:
+            params_list (list): The request parameters (dicts) to fetch.
+
+        Returns:
+            list: The data for each request, in the same order.
+        """
+        results = self.cache_get_many(params_list)
+        misses = [i for i, data in enumerate(results) if data is None]
+        if not misses:
+            return results
+
+        max_workers = min(self.rate_limiter.burst, self.MAX_CONCURRENCY, len(misses))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for i, data in zip(misses, executor.map(self._fetch_coalesced, [params_list[i] for i in misses])):
+                results[i] = data
+        return results
+
+    def warm(self, params_list: list, force: bool = False) -> list:
+        """
+        Make sure several requests are cached, fetching the missing (or, with force, all) entries from the API.
+
+        Unlike the getters, no data is returned, only a small status record per request, so callers such
+        as Celery tasks never pass the payloads around.
+
+        Args:
+            params_list (list): The request parameters (dicts) to warm.
+            force (bool): Fetch every request from the API, even if it is cached (default: False).
+
+        Returns:
+            list: For each request, in the same order, a dict with the cache "key", the "bytes" of the
+            cached entry, when it was fetched ("fetched_at", seconds since the epoch) and its "source"
+            ("cache" or "api"). bytes and fetched_at are None when unknown, e.g. for local cache hits.
+        """
+        entries = [None] * len(params_list) if force else self._cache_lookup(params_list)
+        statuses = []
+        pending = []
+
+        try:
+            for params, entry in zip(params_list, entries):
+                status = {"key": self._generate_cache_key(params), "bytes": None, "fetched_at": None,
+                          "source": "cache"}
+                if entry is not None:
+                    status["fetched_at"], status["bytes"] = entry[1], entry[2]
+                else:
+                    status["source"] = "api"
+                    status["fetched_at"] = time.time()
+                    pending.append((status, (params, self._request_api(params))))
+
+                statuses.append(status)
+
+                if len(pending) >= self.CACHE_WRITE_BATCH:
+                    self._write_warmed(pending)
+                    pending = []
+        finally:
+            # Cache what was already fetched, even if a later request failed
+            self._write_warmed(pending)
+        return statuses
+
+    def _write_warmed(self, pending: list):
+        """
+        Private method to cache fetched (status, (params, data)) pairs and record their size in the statuses.
+        """
+        sizes = self.cache_set_many([item for _, item in pending])
+        for (status, _), size in zip(pending, sizes):
+            status["bytes"] = size
+
+    def cache_get_many(self, params_list: list) -> list:
+        """
+        Look up the cached data of several requests in a single MGET round trip.
+
+        Stale entries count as misses, unless the loader is in stale-while-revalidate mode: then they
+        are returned as they are and a refresh is queued for them.
+
+        Args:
+            params_list (list): The request parameters (dicts) to look up.
+
+        Returns:
+            list: The cached data for each request, in the same order, with None for cache misses.
+        """
+        return [entry[0] if entry is not None else None for entry in self._cache_lookup(params_list)]
+
+    def _cache_lookup(self, params_list: list) -> list:
+        """
+        Private method to look up several requests in the cache (see cache_get_many).
+
+        Returns:
+            list: A (data, stored_at, size) tuple for each request, or None for cache misses; stored_at
+            and size are None for entries served from the local cache and stored_at for legacy entries.
+        """
+        if not params_list:
+            return []
+
+        keys = [self._generate_cache_key(params) for params in params_list]
+        results = [None] * len(params_list)
+        remote = list(range(len(params_list)))
+        lookups = Counter()
+
+        if self.local_cache is not None:
+            for i, key in enumerate(keys):
+                data = self.local_cache.get(key)
+                if data is not None:
+                    results[i] = (data, None, None)
+                    lookups[("cache_hits", params_list[i]["function"], "local")] += 1
+            remote = [i for i in remote if results[i] is None]
+
+        if remote:
+            cached = self.redis.mget([keys[i] for i in remote])
+            now = time.time()
+            stale = []
+
+            for i, cached_data in zip(remote, cached):
+                params = params_list[i]
+                if not cached_data:
+                    lookups[("cache_misses", params["function"], "redis")] += 1
+                    continue
+
+                data, stored_at = decode_cache_entry(cached_data)
+                if self.cache_policy.is_fresh(params["function"], stored_at, now):
+                    results[i] = (data, stored_at, len(cached_data))
+                    lookups[("cache_hits", params["function"], "redis")] += 1
+                    if self.local_cache is not None:
+                        ttl = self.cache_policy.ttl(params["function"])
+                        self.local_cache.set(keys[i], data, ttl if stored_at is None else stored_at + ttl - now)
+                elif self.revalidate is not None:
+                    results[i] = (data, stored_at, len(cached_data))
+                    lookups[("cache_stale_hits", params["function"], "redis")] += 1
+                    stale.append(params)
+                else:
+                    lookups[("cache_misses", params["function"], "redis")] += 1
+
+            self._schedule_revalidation(stale)
+
+        for (name, function, tier), count in lookups.items():
+            metrics.incr(name, count, function=function, tier=tier)
+        return results
+
+    def cache_set_many(self, items: list, ttl: int = None):
+        """
+        Store the data of several requests in the cache in a single pipelined round trip.
+
+        Args:
+            items (list): (params, data) pairs to store.
+            ttl (int): The expiry in seconds (default: the cache policy's expiry for each function).
+
+        Returns:
+            list: The size in bytes of each stored entry.
+        """
+        if not items:
+            return []
+
+        keys = []
+        sizes = []
+        written = Counter()
+        pipe = self.redis.pipeline(transaction=False)
+        for params, data in items:
+            keys.append(self._generate_cache_key(params))
+            expiry = ttl or self.cache_policy.expiry(params["function"])
+            encoded = self.cache_codec.encode(data)
+            sizes.append(len(encoded))
+            written[params["function"]] += len(encoded)
+            pipe.setex(keys[-1], expiry, encoded)
+
+        # Tell every process holding a local copy of these keys to drop it
+        pipe.publish(self.INVALIDATION_CHANNEL, "\n".join([self._instance_id] + keys))
+        pipe.execute()
+
+        for function, size in written.items():
+            metrics.incr("cache_bytes_written", size, function=function)
+
+        if self.local_cache is not None:
+            for key, (params, data) in zip(keys, items):
+                self.local_cache.set(key, data, self.cache_policy.ttl(params["function"]))
+
+        return sizes
+
+    def _handle_invalidation(self, message: dict):
+        """
+        Private method to drop the keys of an invalidation message from the local cache.
+        """
+        sender, *keys = message["data"].decode().split("\n")
+        if sender == self._instance_id:
+            return
+        for key in keys:
+            self.local_cache.invalidate(key)
+
+    def close(self):
+        """
+        Stop listening for cache invalidations and close the HTTP session.
+        """
+        if self._invalidation_thread is not None:
+            self._invalidation_thread.stop()
+            self._invalidation_thread = None
+        self.session.close()
+
+    def _schedule_revalidation(self, params_list: list):
+        """
+        Private method to queue a refresh of stale entries, at most once per entry at a time.
+        """
+        if not params_list:
+            return
+
+        # A short-lived marker per key stops concurrent readers from queueing the same refresh
+        pipe = self.redis.pipeline(transaction=False)
+        for params in params_list:
+            pipe.set(f"{self._generate_cache_key(params)}:revalidating", 1, nx=True, ex=self.REVALIDATION_LOCK_TTL)
+
+        for params, queued in zip(params_list, pipe.execute()):
+            if queued:
+                self.revalidate(params)
+
+    def _request_api(self, params: dict) -> dict:
+        """
+        Private method to call the API, waiting on the shared rate limiter before every request.
+        """
+        function = params["function"]
+        params = {**params, "apikey": self.api_key}
+
+        for attempt in range(self.MAX_RETRIES):
+            metrics.observe("rate_limit_wait_seconds", self.rate_limiter.acquire(), function=function)
+
+            start = time.perf_counter()
+            response = self.session.get(self.base_url, params=params)
+            metrics.observe("api_latency_seconds", time.perf_counter() - start, function=function)
+            metrics.incr("api_requests", function=function, status=response.status_code)
+
+            if response.status_code != 200:
+                raise ConnectionError(f"API request failed: {response.status_code}")
+
+            data = response.json()
+
+            # Check for rate limit message
+            if "Note" not in data:
+                return data
+
+            # Another client is spending the same API key: empty the shared bucket so every
+            # process slows down, then back off with jitter before trying again
+            self.rate_limiter.drain()
+            metrics.incr("rate_limit_exceeded", function=function)
+            delay = self.rate_limiter.backoff(attempt)
+            logger.warning("Rate limit exceeded, retrying in %.1f seconds...", delay)
+            time.sleep(delay)
+
+        raise ConnectionError(f"API rate limit still exceeded after {self.MAX_RETRIES} attempts.")
 
     def _generate_cache_key(self, params: dict) -> str:
         """
-        Generate a unique cache key based on the API function and parameters.
+        Generate a unique cache key based on the API function and parameters (see cache_keys.cache_key).
+        """
+        return cache_key(params)
+
+    def invalidate(self, function: str = None, symbol: str = None) -> int:
+        """
+        Delete every cached entry of a function, a symbol, or both.
+
+        Single-flight locks and revalidation markers are left alone, so fetches already in flight
+        stay coalesced.
+
+        Args:
+            function (str): The Alpha Vantage function, e.g. "OVERVIEW" (default: any).
+            symbol (str): The symbol, in any case (default: any).
+
+        Returns:
+            int: The number of deleted keys.
+        """
+        if function is None and symbol is None:
+            raise ValueError("A function or a symbol is required to invalidate cache entries.")
+
+        deleted = 0
+        batch = []
+        for key in self.redis.scan_iter(match=key_pattern(function, symbol), count=self.INVALIDATION_SCAN_COUNT):
+            key = key.decode() if isinstance(key, bytes) else key
+            if is_marker(key):
+                continue
+            batch.append(key)
+            if len(batch) >= self.INVALIDATION_SCAN_COUNT:
+                deleted += self._unlink(batch)
+                batch = []
+        deleted += self._unlink(batch)
+        return deleted
+
+    def _unlink(self, keys: list) -> int:
+        """
+        Private method to delete keys without blocking Redis and drop them from every local cache.
         """
-        return f"{params['function']}_{params.get('symbol', '')}_{params.get('outputsize', '')}"
+        if not keys:
+            return 0
 
-    def get_bulk_data(self, symbols: list, function="TIME_SERIES_QUARTERLY_ADJUSTED") -> dict:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.unlink(*keys)
+        pipe.publish(self.INVALIDATION_CHANNEL, "\n".join([self._instance_id] + keys))
+        deleted, _ = pipe.execute()
+
+        if self.local_cache is not None:
+            for key in keys:
+                self.local_cache.invalidate(key)
+        return deleted
+
+    def get_bulk_data(self, symbols: list, function="TIME_SERIES_QUARTERLY_ADJUSTED", outputsize: str = "full",
+                      return_exceptions: bool = False) -> dict:
         """
         Fetch bulk financial data (default: quarterly adjusted time series) for multiple stocks.
+        Pass outputsize="compact" to only get the latest 100 data points of each series.
+
+        The cache is read for all symbols in one round trip, and fetched data is written back
+        in pipelined batches of CACHE_WRITE_BATCH entries. If a request fails, the data fetched before
+        it is still cached. A failed request raises, unless return_exceptions is set: then the exception
+        is returned as the data of its symbol and the other symbols are still fetched.
         """
         results = {}
+        params_list = [{"function": function, "symbol": symbol, "outputsize": outputsize} for symbol in symbols]
+        pending = []
 
-        for symbol in symbols:
-            print(f"Fetching data for {symbol}...")
-            params = {
-                "function": function,
-                "symbol": symbol,
-                "outputsize": "full"
-            }
-            results[symbol] = self._fetch_data(params)
-            time.sleep(15)  # Alpha Vantage rate limit: 5 requests per minute
+        try:
+            for symbol, params, cached_data in zip(symbols, params_list, self.cache_get_many(params_list)):
+                if cached_data is not None:
+                    results[symbol] = cached_data
+                    continue
 
+                logger.debug("Fetching data for %s...", symbol)
+                try:
+                    results[symbol] = self._request_api(params)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[symbol] = e
+                    continue
+                pending.append((params, results[symbol]))
+
+                if len(pending) >= self.CACHE_WRITE_BATCH:
+                    self.cache_set_many(pending)
+                    pending = []
+        finally:
+            # Cache what was already fetched, even if a later request failed
+            self.cache_set_many(pending)
         return results
 
+    async def stream_bulk_data(self, symbols: list, function="TIME_SERIES_QUARTERLY_ADJUSTED",
+                               max_concurrency: int = None, return_exceptions: bool = False, outputsize: str = "full"):
+        """
+        Asynchronously fetch bulk financial data for multiple stocks, yielding (symbol, data) pairs as they finish.
+        Pass outputsize="compact" to only get the latest 100 data points of each series.
+
+        The cache is checked for every symbol in a single round trip and cached symbols are yielded first.
+        Cache misses are fetched concurrently over the shared HTTP session, at most max_concurrency at a time
+        (default: the rate limiter's burst size, capped at MAX_CONCURRENCY), and every request still waits on
+        the shared rate limiter. When a fetch raises or the caller stops iterating, the fetches that have not
+        started yet are cancelled and the event loop does not wait for the ones under way.
+
+        A failed fetch raises, unless return_exceptions is set: then the exception is yielded as the data of
+        its symbol and the other symbols are still fetched.
+        """
+        params_list = [{"function": function, "symbol": symbol, "outputsize": outputsize} for symbol in symbols]
+
+        misses = []
+        for symbol, params, cached_data in zip(symbols, params_list, self.cache_get_many(params_list)):
+            if cached_data is not None:
+                yield symbol, cached_data
+            else:
+                misses.append((symbol, params))
+
+        if not misses:
+            return
+
+        max_concurrency = max_concurrency or min(self.rate_limiter.burst, self.MAX_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(misses)))
+
+        async def fetch(symbol: str, params: dict):
+            try:
+                return symbol, await loop.run_in_executor(executor, self._fetch_coalesced, params)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return symbol, e
+
+        tasks = [asyncio.ensure_future(fetch(symbol, params)) for symbol, params in misses]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Never block the event loop on fetches under way, nor spend the rate budget on abandoned ones
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def get_bulk_data_async(self, symbols: list, function="TIME_SERIES_QUARTERLY_ADJUSTED",
+                                  max_concurrency: int = None, return_exceptions: bool = False,
+                                  outputsize: str = "full") -> dict:
+        """
+        Asynchronously fetch bulk financial data for multiple stocks. See stream_bulk_data.
+        """
+        return {symbol: data async for symbol, data in self.stream_bulk_data(symbols, function, max_concurrency,
+                                                                                return_exceptions, outputsize)}
+
     def get_stock_price(self, symbol: str) -> dict:
         """
         Fetch the latest stock price for a given symbol.
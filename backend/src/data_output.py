@@ -1,9 +1,36 @@
+import numpy as np
 import pandas as pd
 import json
+import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from .metrics import metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+logger = logging.getLogger(__name__)
+
+# Characters Excel does not allow in sheet names
+_SHEET_NAME_INVALID = re.compile(r"[\[\]:*?/\\]")
+
 class DataOutput:
+    # Rows serialized at a time by the streaming writers
+    CHUNK_SIZE = 50000
+    # Data rows per Excel sheet (the sheet limit is 1,048,576 rows, one of which is the header)
+    EXCEL_MAX_ROWS = 1048575
+
     def __init__(self, output_dir: str = "output"):
         """
         Initialize the DataOutput class.
@@ -14,30 +41,133 @@ class DataOutput:
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)  # Create output directory if it doesn't exist
 
-    def save_to_excel(self, df: pd.DataFrame, filename: str = None) -> str:
+    @metrics.timed("output_seconds", format="excel")
+    def save_to_excel(self, df: pd.DataFrame, filename: str = None, constant_memory: bool = True) -> str:
         """
         Save a DataFrame to an Excel file.
 
+        By default (when xlsxwriter is installed) the file is written row by row in xlsxwriter's
+        constant_memory mode, and frames longer than an Excel sheet are split over several sheets.
+
         Args:
             df (pd.DataFrame): The DataFrame to save.
             filename (str): The name of the Excel file. If not provided, a timestamped filename will be used.
+            constant_memory (bool): Use the constant-memory writer (default: True); otherwise use df.to_excel.
+
+        Returns:
+            str: The path to the saved Excel file.
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"data_{timestamp}.xlsx"
+
+        filepath = os.path.join(self.output_dir, filename)
+        if constant_memory and xlsxwriter is not None:
+            self._write_excel(filepath, {"Sheet1": df})
+        else:
+            df.to_excel(filepath, index=True)
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="excel")
+        logger.info("Data saved to Excel file: %s", filepath)
+        return filepath
+
+    @metrics.timed("output_seconds", format="excel")
+    def save_to_excel_bulk(self, frames: dict, filename: str = None) -> str:
+        """
+        Save several DataFrames (e.g. one per symbol) to a single Excel file, one sheet per DataFrame,
+        with the constant-memory writer.
+
+        Args:
+            frames (dict): The DataFrames to save, keyed by sheet name (e.g. the symbol).
+            filename (str): The name of the Excel file. If not provided, a timestamped filename will be used.
 
         Returns:
             str: The path to the saved Excel file.
         """
+        if xlsxwriter is None:
+            raise ImportError("Saving several sheets requires the xlsxwriter package.")
+
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"data_{timestamp}.xlsx"
 
         filepath = os.path.join(self.output_dir, filename)
-        df.to_excel(filepath, index=True)
-        print(f"Data saved to Excel file: {filepath}")
+        self._write_excel(filepath, frames)
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="excel")
+        logger.info("Data saved to Excel file: %s", filepath)
         return filepath
 
+    def _write_excel(self, filepath: str, frames: dict):
+        """
+        Private method to write DataFrames to an Excel file in constant-memory mode.
+        A DataFrame longer than EXCEL_MAX_ROWS continues on sheets named "<name> (2)", "<name> (3)", ...
+        """
+        workbook = xlsxwriter.Workbook(filepath, {"constant_memory": True})
+        try:
+            date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+            header_format = workbook.add_format({"bold": True})
+
+            used_names = set()
+            for name, df in frames.items():
+                index_name = df.index.name or ""
+                is_dates = isinstance(df.index, pd.DatetimeIndex)
+                header = [index_name] + [str(column) for column in df.columns]
+                name = _SHEET_NAME_INVALID.sub("_", str(name)).strip("'") or "Sheet"
+
+                for part, start in enumerate(range(0, max(len(df), 1), self.EXCEL_MAX_ROWS)):
+                    worksheet = workbook.add_worksheet(self._sheet_name(name, part, used_names))
+                    worksheet.write_row(0, 0, header, header_format)
+                    if is_dates:
+                        worksheet.set_column(0, 0, 12, date_format)
+
+                    sheet = df.iloc[start:start + self.EXCEL_MAX_ROWS]
+                    row = 1
+                    for chunk_start in range(0, len(sheet), self.CHUNK_SIZE):
+                        for values in self._excel_rows(sheet.iloc[chunk_start:chunk_start + self.CHUNK_SIZE], is_dates):
+                            worksheet.write_row(row, 0, values)
+                            row += 1
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _sheet_name(name: str, part: int, used_names: set) -> str:
+        """
+        Private method to get a unique sheet name of at most 31 characters (Excel's limit) for a part of a DataFrame.
+        """
+        number = part + 1
+        while True:
+            suffix = f" ({number})" if number > 1 else ""
+            sheet_name = f"{name[:31 - len(suffix)]}{suffix}"
+            # Excel compares sheet names case-insensitively
+            if sheet_name.lower() not in used_names:
+                used_names.add(sheet_name.lower())
+                return sheet_name
+            number += 1
+
+    def _excel_rows(self, chunk: pd.DataFrame, is_dates: bool):
+        """
+        Private method to convert a chunk of a DataFrame to rows of plain values,
+        with missing and infinite values as None (blank cells) and dates as Excel serial numbers.
+        """
+        if is_dates:
+            index = ((chunk.index - pd.Timestamp("1899-12-30")) / pd.Timedelta(days=1)).to_numpy()
+        else:
+            index = chunk.index.to_numpy(dtype=object)
+
+        values = chunk.to_numpy(dtype=object)
+        values[(pd.isna(chunk) | chunk.isin([np.inf, -np.inf])).to_numpy()] = None
+        return (
+            [index_value] + row
+            for index_value, row in zip(index.tolist(), values.tolist())
+        )
+
+    @metrics.timed("output_seconds", format="json")
     def save_to_json(self, data: dict|pd.DataFrame, filename: str = None) -> str:
         """
         Save data (dict or DataFrame) to a JSON file.
 
+        DataFrames are written as a list of records, including the index (e.g. the date) as the first
+        field of every record, CHUNK_SIZE rows at a time so memory use does not grow with the frame.
+
         Args:
             data (dict or pd.DataFrame): The data to save.
             filename (str): The name of the JSON file. If not provided, a timestamped filename will be used.
@@ -45,19 +175,98 @@ class DataOutput:
         Returns:
             str: The path to the saved JSON file.
         """
-        if isinstance(data, pd.DataFrame):
-            data = data.to_dict(orient="records")  # Convert DataFrame to a list of dictionaries
-
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"data_{timestamp}.json"
 
         filepath = os.path.join(self.output_dir, filename)
         with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"Data saved to JSON file: {filepath}")
+            if isinstance(data, pd.DataFrame):
+                f.write("[")
+                for i, chunk in enumerate(self._iter_chunks(data)):
+                    records = chunk.to_json(orient="records", date_format="iso")
+                    if records != "[]":
+                        f.write(("," if i else "") + records[1:-1])
+                f.write("]")
+            else:
+                json.dump(data, f, indent=4)
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="json")
+        logger.info("Data saved to JSON file: %s", filepath)
+        return filepath
+
+    @metrics.timed("output_seconds", format="ndjson")
+    def save_to_ndjson(self, df: pd.DataFrame, filename: str = None) -> str:
+        """
+        Save a DataFrame to a newline-delimited JSON file (one record per line, including the index),
+        CHUNK_SIZE rows at a time.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to save.
+            filename (str): The name of the NDJSON file. If not provided, a timestamped filename will be used.
+
+        Returns:
+            str: The path to the saved NDJSON file.
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"data_{timestamp}.ndjson"
+
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'w') as f:
+            for chunk in self._iter_chunks(df):
+                lines = chunk.to_json(orient="records", lines=True, date_format="iso")
+                f.write(lines if lines.endswith("\n") else lines + "\n")
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="ndjson")
+        logger.info("Data saved to NDJSON file: %s", filepath)
+        return filepath
+
+    @metrics.timed("output_seconds", format="parquet")
+    def save_to_parquet(self, df: pd.DataFrame, filename: str = None) -> str:
+        """
+        Save a DataFrame to a Parquet file, writing one row group of CHUNK_SIZE rows at a time.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to save.
+            filename (str): The name of the Parquet file. If not provided, a timestamped filename will be used.
+
+        Returns:
+            str: The path to the saved Parquet file.
+        """
+        if pa is None:
+            raise ImportError("Saving to Parquet requires the pyarrow package.")
+
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"data_{timestamp}.parquet"
+
+        filepath = os.path.join(self.output_dir, filename)
+        # Inferred once from the whole frame, so every chunk is written with the same column types
+        index = df.index.to_frame(index=False, name=self._index_name(df))
+        schema = pa.unify_schemas([pa.Schema.from_pandas(index, preserve_index=False),
+                                   pa.Schema.from_pandas(df, preserve_index=False)]).remove_metadata()
+        with pq.ParquetWriter(filepath, schema) as writer:
+            for chunk in self._iter_chunks(df):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="parquet")
+        logger.info("Data saved to Parquet file: %s", filepath)
         return filepath
 
+    def _iter_chunks(self, df: pd.DataFrame):
+        """
+        Private method to yield CHUNK_SIZE-row slices of a DataFrame, with the index as the first column.
+        """
+        index_name = self._index_name(df)
+        for start in range(0, max(len(df), 1), self.CHUNK_SIZE):
+            yield df.iloc[start:start + self.CHUNK_SIZE].rename_axis(index_name).reset_index()
+
+    @staticmethod
+    def _index_name(df: pd.DataFrame) -> str:
+        """
+        Private method to get the column name the index is written under.
+        """
+        return df.index.name or ("Date" if isinstance(df.index, pd.DatetimeIndex) else "index")
+
+    @metrics.timed("output_seconds", format="csv")
     def save_to_csv(self, df: pd.DataFrame, filename: str = None) -> str:
         """
         Save a DataFrame to a CSV file.
@@ -74,17 +283,21 @@ class DataOutput:
             filename = f"data_{timestamp}.csv"
 
         filepath = os.path.join(self.output_dir, filename)
-        df.to_csv(filepath, index=True)
-        print(f"Data saved to CSV file: {filepath}")
+        df.to_csv(filepath, index=True, chunksize=self.CHUNK_SIZE)
+        metrics.incr("output_bytes", os.path.getsize(filepath), format="csv")
+        logger.info("Data saved to CSV file: %s", filepath)
         return filepath
 
-    def save_to_multiple_formats(self, df: pd.DataFrame, base_filename: str = None) -> dict:
+    @metrics.timed("output_seconds", format="multiple")
+    def save_to_multiple_formats(self, df: pd.DataFrame, base_filename: str = None,
+                                 formats: tuple = ("excel", "json", "csv")) -> dict:
         """
-        Save a DataFrame to multiple formats (Excel, JSON, and CSV).
+        Save a DataFrame to multiple formats (by default Excel, JSON, and CSV), writing the files in parallel.
 
         Args:
             df (pd.DataFrame): The DataFrame to save.
             base_filename (str): The base name for the files. If not provided, a timestamped name will be used.
+            formats (tuple): The formats to write, among "excel", "json", "csv", "ndjson" and "parquet".
 
         Returns:
             dict: A dictionary containing the paths to the saved files.
@@ -93,12 +306,20 @@ class DataOutput:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_filename = f"data_{timestamp}"
 
-        excel_file = self.save_to_excel(df, f"{base_filename}.xlsx")
-        json_file = self.save_to_json(df, f"{base_filename}.json")
-        csv_file = self.save_to_csv(df, f"{base_filename}.csv")
+        writers = {
+            "excel": (self.save_to_excel, "xlsx"),
+            "json": (self.save_to_json, "json"),
+            "csv": (self.save_to_csv, "csv"),
+            "ndjson": (self.save_to_ndjson, "ndjson"),
+            "parquet": (self.save_to_parquet, "parquet")
+        }
+        unknown = set(formats) - set(writers)
+        if unknown:
+            raise ValueError(f"Unsupported output formats: {sorted(unknown)}")
 
-        return {
-            "excel": excel_file,
-            "json": json_file,
-            "csv": csv_file
-        }
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+            futures = {
+                output_format: executor.submit(writers[output_format][0], df, f"{base_filename}.{writers[output_format][1]}")
+                for output_format in formats
+            }
+            return {output_format: future.result() for output_format, future in futures.items()}
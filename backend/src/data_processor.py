@@ -1,4 +1,9 @@
+import numpy as np
 import pandas as pd
+from operator import itemgetter
+
+from .indicators import compute_indicators, downcast as downcast_frame
+from .metrics import metrics
 
 class DataProcessor:
     def __init__(self):
@@ -7,6 +12,7 @@ class DataProcessor:
         """
         pass
 
+    @metrics.timed("processor_stage_seconds", stage="json_to_dataframe")
     def json_to_dataframe(self, data: dict, nested_key: str = None) -> pd.DataFrame:
         """
         Convert JSON data (e.g., from Alpha Vantage API) into a pandas DataFrame.
@@ -35,6 +41,78 @@ class DataProcessor:
         
         return df
 
+    @metrics.timed("processor_stage_seconds", stage="parse_time_series")
+    def parse_time_series(self, data: dict, nested_key: str = None) -> pd.DataFrame:
+        """
+        Fast path of json_to_dataframe for Alpha Vantage time series (daily, weekly, monthly, quarterly, intraday).
+
+        Values are converted straight into float64 (and int64 volume) arrays and the dates are parsed
+        with an explicit format, instead of going through object-dtype string columns.
+
+        Args:
+            data (dict): The JSON data to convert.
+            nested_key (str): The key containing the time series (default: the first key containing "Time Series").
+
+        Returns:
+            pd.DataFrame: A DataFrame with the same columns, order and DatetimeIndex as json_to_dataframe.
+        """
+        if nested_key is None:
+            nested_key = next((key for key in data if "Time Series" in key), None)
+        series = data.get(nested_key, {}) if nested_key else {}
+
+        if not series:
+            raise ValueError("No data found in the provided JSON.")
+
+        dates = list(series.keys())
+        rows = list(series.values())
+        columns = list(rows[0].keys())
+
+        get_values = itemgetter(*columns)
+        values = np.array([get_values(row) for row in rows], dtype=np.float64).reshape(len(rows), len(columns))
+
+        date_format = '%Y-%m-%d' if len(dates[0]) == 10 else '%Y-%m-%d %H:%M:%S'
+        df = pd.DataFrame(values, index=pd.to_datetime(dates, format=date_format), columns=columns)
+
+        for column in columns:
+            if column.endswith('volume'):
+                df[column] = df[column].astype(np.int64)
+
+        return df
+
+    @metrics.timed("processor_stage_seconds", stage="parse_reports")
+    def parse_reports(self, data: dict, report_key: str = 'quarterlyReports') -> pd.DataFrame:
+        """
+        Parse the reports of a fundamentals payload (e.g., INCOME_STATEMENT) into a typed DataFrame.
+
+        Args:
+            data (dict): The JSON data to convert.
+            report_key (str): 'annualReports' or 'quarterlyReports' (default: 'quarterlyReports').
+
+        Returns:
+            pd.DataFrame: One row per report indexed by 'fiscalDateEnding' (oldest first), with float64 figures
+                ("None" becomes NaN) and 'reportedCurrency' kept as a string column.
+        """
+        reports = data.get(report_key, [])
+        if not reports:
+            raise ValueError("No data found in the provided JSON.")
+
+        columns = [column for column in reports[0] if column not in ('fiscalDateEnding', 'reportedCurrency')]
+        rows = [[report.get(column, 'None') for column in columns] for report in reports]
+
+        try:
+            values = np.array([[np.nan if value == 'None' else value for value in row] for row in rows], dtype=np.float64)
+            df = pd.DataFrame(values, columns=columns)
+        except ValueError:
+            # Some field is neither a number nor "None": fall back to converting column by column
+            df = pd.DataFrame(rows, columns=columns).apply(pd.to_numeric, errors='coerce').astype(np.float64)
+
+        df.index = pd.to_datetime([report['fiscalDateEnding'] for report in reports], format='%Y-%m-%d')
+        df.index.name = 'fiscalDateEnding'
+        df.insert(0, 'reportedCurrency', [report.get('reportedCurrency') for report in reports])
+
+        return df.sort_index()
+
+    @metrics.timed("processor_stage_seconds", stage="clean_stock_data")
     def clean_stock_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Clean and standardize stock data DataFrame.
@@ -59,6 +137,7 @@ class DataProcessor:
 
         return df
 
+    @metrics.timed("processor_stage_seconds", stage="calculate_returns")
     def calculate_returns(self, df: pd.DataFrame, price_column: str = 'Close') -> pd.DataFrame:
         """
         Calculate daily and cumulative returns for a stock.
@@ -75,6 +154,7 @@ class DataProcessor:
         
         return df
 
+    @metrics.timed("processor_stage_seconds", stage="calculate_moving_average")
     def calculate_moving_average(self, df: pd.DataFrame, price_column: str = 'Close', window: int = 20) -> pd.DataFrame:
         """
         Calculate the moving average for a stock.
@@ -91,9 +171,278 @@ class DataProcessor:
         
         return df
 
+    @metrics.timed("processor_stage_seconds", stage="calculate_indicators")
+    def calculate_indicators(self, df: pd.DataFrame, indicators: list, price_column: str = 'Close',
+                             downcast: bool = False) -> pd.DataFrame:
+        """
+        Calculate several indicators at once, e.g.
+        ["sma:20", "sma:50", "sma:200", "ema:12", "log_return", "volatility:20", "drawdown", "vwap"].
+
+        Supported: sma:<window> and ema:<window> ('SMA 20', 'EMA 12'), log_return ('Log Return'),
+        volatility:<window> (standard deviation of the log returns, 'Volatility 20'), drawdown (from the
+        running peak, 'Drawdown') and vwap or vwap:<window> (cumulative or rolling, from 'Volume', 'VWAP').
+
+        Args:
+            df (pd.DataFrame): The stock data DataFrame.
+            indicators (list): The indicator specs, as strings like "sma:20" or (name, window) tuples.
+            price_column (str): The column containing the price data (default: 'Close').
+            downcast (bool): Store floats as float32, integers in the smallest type and repeated text as
+                categoricals, about halving the memory used (default: False).
+
+        Returns:
+            pd.DataFrame: A new DataFrame with one added column per indicator; df is left unchanged.
+        """
+        df = df.sort_index()
+        df = df.assign(**compute_indicators(df, indicators, price_column))
+        return downcast_frame(df) if downcast else df
+
+    def downcast(self, df: pd.DataFrame, categorical_threshold: float = 0.5) -> pd.DataFrame:
+        """
+        Shrink a DataFrame: floats to float32, integers to the smallest type holding them, and text columns
+        with at most categorical_threshold distinct values per row to categoricals.
+
+        Returns:
+            pd.DataFrame: The downcast DataFrame.
+        """
+        return downcast_frame(df, categorical_threshold)
+
+    @metrics.timed("processor_stage_seconds", stage="extend_returns")
+    def extend_returns(self, history: pd.DataFrame, new_rows: pd.DataFrame, price_column: str = 'Close') -> pd.DataFrame:
+        """
+        Calculate daily and cumulative returns for rows following an already processed history,
+        without recomputing the history.
+
+        Args:
+            history (pd.DataFrame): The processed history (sorted by date) with 'Daily Return' and 'Cumulative Return' columns.
+            new_rows (pd.DataFrame): The rows following the history (sorted by date).
+            price_column (str): The column containing the price data (default: 'Close').
+
+        Returns:
+            pd.DataFrame: new_rows with added 'Daily Return' and 'Cumulative Return' columns, continuing the history.
+        """
+        if history.empty:
+            return self.calculate_returns(new_rows, price_column)
+
+        new_rows = new_rows.copy()
+        prices = pd.concat([history[price_column].iloc[-1:], new_rows[price_column]])
+        new_rows['Daily Return'] = prices.pct_change().iloc[1:]
+
+        # The first row of a history has no return, so its cumulative return is NaN
+        last_cumulative = history['Cumulative Return'].iloc[-1]
+        last_cumulative = 1.0 if pd.isna(last_cumulative) else last_cumulative
+        new_rows['Cumulative Return'] = last_cumulative * (1 + new_rows['Daily Return']).cumprod()
+
+        return new_rows
+
+    @metrics.timed("processor_stage_seconds", stage="extend_moving_average")
+    def extend_moving_average(self, history: pd.DataFrame, new_rows: pd.DataFrame, price_column: str = 'Close',
+                              window: int = 20) -> pd.DataFrame:
+        """
+        Calculate the moving average for rows following an already processed history,
+        using only the last window - 1 rows of the history.
+
+        Args:
+            history (pd.DataFrame): The processed history (sorted by date).
+            new_rows (pd.DataFrame): The rows following the history (sorted by date).
+            price_column (str): The column containing the price data (default: 'Close').
+            window (int): The window size for the moving average (default: 20).
+
+        Returns:
+            pd.DataFrame: new_rows with an added 'Moving Average' column, continuing the history.
+        """
+        new_rows = new_rows.copy()
+        tail = history[price_column].iloc[max(0, len(history) - (window - 1)):] if window > 1 else history[price_column].iloc[:0]
+        prices = pd.concat([tail, new_rows[price_column]])
+        new_rows['Moving Average'] = prices.rolling(window=window).mean().iloc[len(tail):]
+
+        return new_rows
+
+    @metrics.timed("processor_stage_seconds", stage="build_panel")
+    def build_panel(self, data: dict, nested_key: str = None) -> pd.DataFrame:
+        """
+        Build a single panel DataFrame for many symbols, indexed by date with (field, symbol) columns.
+
+        Args:
+            data (dict): Per-symbol JSON data (e.g., from DataLoader.get_bulk_data) or already cleaned DataFrames.
+            nested_key (str): The key in the JSON data that contains the time series (e.g., "Time Series (Daily)").
+
+        Returns:
+            pd.DataFrame: The panel, sorted by date, with columns such as ('Close', 'AAPL');
+                panel['Close'] is a date x symbol frame of closing prices.
+        """
+        if not data:
+            raise ValueError("No data found to build a panel.")
+
+        frames = {}
+        for symbol, symbol_data in data.items():
+            if not isinstance(symbol_data, pd.DataFrame):
+                symbol_data = self.clean_stock_data(self.json_to_dataframe(symbol_data, nested_key))
+            frames[symbol] = symbol_data
+
+        panel = pd.concat(frames, axis=1, names=['Symbol', 'Field'])
+        return panel.swaplevel(axis=1).sort_index().sort_index(axis=1)
+
+    @metrics.timed("processor_stage_seconds", stage="calculate_panel_metrics")
+    def calculate_panel_metrics(self, panel: pd.DataFrame, price_field: str = 'Close', window: int = 20) -> pd.DataFrame:
+        """
+        Calculate daily returns, cumulative returns and the moving average for every symbol of a panel at once.
+
+        Args:
+            panel (pd.DataFrame): A panel built by build_panel.
+            price_field (str): The field containing the price data (default: 'Close').
+            window (int): The window size for the moving average (default: 20).
+
+        Returns:
+            pd.DataFrame: The panel with added 'Daily Return', 'Cumulative Return' and 'Moving Average' fields.
+                Metrics depending on a date where a symbol has no price are NaN for that symbol, like the
+                cumulative return on its first date; later cumulative returns include the moves across such dates.
+        """
+        prices = panel[price_field]
+        daily_returns = prices.pct_change(fill_method=None)
+
+        panel_metrics = pd.concat({
+            'Daily Return': daily_returns,
+            # Relative to each symbol's first price, so it stays right across dates without a price
+            'Cumulative Return': (prices / prices.bfill().iloc[0]).where(prices.notna().cumsum() > 1),
+            'Moving Average': prices.rolling(window=window, min_periods=window).mean()
+        }, axis=1, names=['Field', 'Symbol'])
+
+        return pd.concat([panel.drop(columns=list(panel_metrics.columns.levels[0]), level=0, errors='ignore'), panel_metrics],
+                         axis=1).sort_index(axis=1)
+
+    def split_panel(self, panel: pd.DataFrame) -> dict:
+        """
+        Split a panel back into one DataFrame per symbol.
+
+        Args:
+            panel (pd.DataFrame): A panel built by build_panel.
+
+        Returns:
+            dict: A DataFrame per symbol, without the dates on which the symbol has no data.
+        """
+        return {
+            symbol: panel.xs(symbol, axis=1, level=1).dropna(how='all')
+            for symbol in panel.columns.get_level_values(1).unique()
+        }
+
+    @metrics.timed("processor_stage_seconds", stage="downsample_lttb")
+    def downsample_lttb(self, df: pd.DataFrame, points: int, column: str = 'Close') -> pd.DataFrame:
+        """
+        Downsample a time series to at most points rows with Largest-Triangle-Three-Buckets, which keeps
+        the rows that shape the line chart of column (peaks, troughs, the first and the last row).
+
+        Args:
+            df (pd.DataFrame): The time series, indexed by date.
+            points (int): The target number of rows (at least 3).
+            column (str): The column the rows are selected on (default: 'Close').
+
+        Returns:
+            pd.DataFrame: The selected rows, with all their columns.
+        """
+        if points < 3:
+            raise ValueError("LTTB needs at least 3 points.")
+        n = len(df)
+        if n <= points:
+            return df
+
+        df = df.sort_index()
+        x = df.index.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 86400e9
+        y = df[column].ffill().bfill().to_numpy(dtype=float)
+
+        selected = np.empty(points, dtype=np.int64)
+        selected[0], selected[-1] = 0, n - 1
+        # The rows between the first and the last are split into points - 2 buckets
+        edges = (np.arange(points - 1) * (n - 2) / (points - 2)).astype(np.int64) + 1
+        edges[-1] = n - 1
+
+        a = 0
+        for i in range(points - 2):
+            start, end = edges[i], edges[i + 1]
+            next_end = edges[i + 2] if i + 2 < len(edges) else n
+            # Pick the row forming the largest triangle with the previous pick and the next bucket's average
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+            area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+            a = start + int(np.argmax(area))
+            selected[i + 1] = a
+
+        return df.iloc[selected]
+
+    @metrics.timed("processor_stage_seconds", stage="downsample_ohlc")
+    def downsample_ohlc(self, df: pd.DataFrame, points: int) -> pd.DataFrame:
+        """
+        Downsample a time series to at most points rows by aggregating consecutive rows into OHLC bars:
+        first Open, highest High, lowest Low, last Close, total Volume, and the last value of any other column.
+
+        Args:
+            df (pd.DataFrame): The time series, indexed by date.
+            points (int): The target number of rows.
+
+        Returns:
+            pd.DataFrame: One row per bucket, indexed by the date the bucket starts on.
+        """
+        if points < 1:
+            raise ValueError("points must be at least 1.")
+        n = len(df)
+        if n <= points:
+            return df
+
+        df = df.sort_index()
+        starts = np.unique(np.linspace(0, n, points + 1).astype(np.int64)[:-1])
+        ends = np.append(starts[1:], n) - 1
+
+        buckets = {}
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if column == 'Open':
+                buckets[column] = values[starts]
+            elif column == 'High':
+                buckets[column] = np.fmax.reduceat(values, starts)
+            elif column == 'Low':
+                buckets[column] = np.fmin.reduceat(values, starts)
+            elif column == 'Volume':
+                buckets[column] = np.add.reduceat(values, starts)
+            else:
+                buckets[column] = values[ends]
+
+        return pd.DataFrame(buckets, index=df.index[starts], columns=df.columns)
+
+    def chart_series(self, df: pd.DataFrame, start_date: str = None, end_date: str = None, points: int = 500,
+                     method: str = 'lttb', column: str = 'Close') -> pd.DataFrame:
+        """
+        Get a date window of a time series, downsampled for a chart.
+
+        Args:
+            df (pd.DataFrame): The time series, indexed by date.
+            start_date (str): The start date in 'YYYY-MM-DD' format (default: the first date).
+            end_date (str): The end date in 'YYYY-MM-DD' format (default: the last date).
+            points (int): The target number of rows (default: 500).
+            method (str): 'lttb' for line charts or 'ohlc' for candlestick charts (default: 'lttb').
+            column (str): The column LTTB selects the rows on (default: 'Close').
+
+        Returns:
+            pd.DataFrame: At most points rows of the window.
+        """
+        if method not in ('lttb', 'ohlc'):
+            raise ValueError(f"Unknown downsampling method: {method}")
+
+        df = df.sort_index()
+        if start_date or end_date:
+            df = self.filter_by_date(df, start_date or df.index.min(), end_date or df.index.max())
+
+        if method == 'ohlc':
+            return self.downsample_ohlc(df, points)
+        return self.downsample_lttb(df, points, column)
+
+    @metrics.timed("processor_stage_seconds", stage="merge_data")
     def merge_data(self, dfs: list, on: str = 'Date', how: str = 'inner') -> pd.DataFrame:
         """
-        Merge multiple DataFrames on a common column (e.g., 'Date').
+        Merge multiple DataFrames on a common column (e.g., 'Date'), or on their date index when they
+        do not have that column (as returned by json_to_dataframe).
+
+        The result is the same as merging the frames one after the other with pd.merge. When that result
+        can be computed in one aligned pass (unique, sorted keys, no overlapping columns and an 'inner',
+        'outer' or 'left' join), align_frames is used; otherwise the frames are merged with pd.merge,
+        e.g. overlapping columns get '_x'/'_y' suffixes.
 
         Args:
             dfs (list): A list of DataFrames to merge.
@@ -101,14 +450,108 @@ class DataProcessor:
             how (str): The type of merge to perform (default: 'inner').
 
         Returns:
-            pd.DataFrame: The merged DataFrame.
+            pd.DataFrame: The merged DataFrame (with the on column when the frames had it).
         """
+        with_column = all(on in df.columns for df in dfs)
+        keys = [df[on] if with_column else df.index for df in dfs]
+
+        if self._can_align(dfs, keys, how):
+            if not with_column:
+                return self.align_frames(dfs, how=how)
+            merged = self.align_frames([df.set_index(on) for df in dfs], how=how)
+            # Concatenated rather than reset_index, which would insert into a frame of one block per input
+            merged = pd.concat([pd.DataFrame({on: merged.index}), merged.reset_index(drop=True)], axis=1)
+            # pd.merge keeps the columns of the first frame in place, the on column included
+            position = dfs[0].columns.get_loc(on)
+            if position:
+                columns = list(merged.columns[1:])
+                merged = merged[columns[:position] + [on] + columns[position:]]
+            return merged
+
         merged_df = dfs[0]
         for df in dfs[1:]:
-            merged_df = pd.merge(merged_df, df, on=on, how=how)
-        
+            if with_column:
+                merged_df = pd.merge(merged_df, df, on=on, how=how)
+            else:
+                merged_df = pd.merge(merged_df, df, left_index=True, right_index=True, how=how)
         return merged_df
 
+    @staticmethod
+    def _can_align(dfs: list, keys: list, how: str) -> bool:
+        """
+        Private method to check whether align_frames gives the same result as iterative pd.merge calls.
+        """
+        if how not in ('inner', 'outer', 'left'):
+            return False
+        if not all(key.is_unique and key.is_monotonic_increasing and not key.hasnans for key in keys):
+            return False
+        columns = [column for df, key in zip(dfs, keys) for column in df.columns if column != key.name]
+        return len(columns) == len(set(columns))
+
+    @metrics.timed("processor_stage_seconds", stage="align_frames")
+    def align_frames(self, frames: dict | list, how: str = 'inner', fill: str = None,
+                     tolerance: str | pd.Timedelta = None, sep: str = '_') -> pd.DataFrame:
+        """
+        Join many DataFrames on their (date) index in a single pass: the joined index is computed once,
+        every frame is aligned to it and all of them are concatenated at once, instead of growing the
+        result one merge at a time. Unlike merge_data, the index of every frame must be unique and
+        column names must not overlap.
+
+        Args:
+            frames (dict or list): DataFrames indexed by date; a dict of frames per symbol gets its columns
+                prefixed with the symbol (e.g. 'AAPL_Close').
+            how (str): 'inner' (dates in every frame), 'outer' (dates in any frame) or 'left'
+                (the dates of the first frame) (default: 'inner').
+            fill (str): 'ffill' to fill each frame's values forward onto dates it does not have, i.e. an
+                as-of join, e.g. quarterly fundamentals onto daily prices (default: None). With fill, 'inner'
+                keeps the dates of any frame from the first date on which every frame has data.
+            tolerance (str or pd.Timedelta): With fill='ffill', how old a value may be, e.g. '100D' (default: no limit).
+            sep (str): The separator between the symbol and the column name (default: '_').
+
+        Returns:
+            pd.DataFrame: The joined DataFrame, sorted by date.
+        """
+        if how not in ('inner', 'outer', 'left'):
+            raise ValueError(f"Unsupported join: {how}")
+        if fill not in (None, 'ffill'):
+            raise ValueError(f"Unsupported fill: {fill}")
+        if not len(frames):
+            raise ValueError("No data found to align.")
+
+        if isinstance(frames, dict):
+            frames = [df.add_prefix(f"{symbol}{sep}") for symbol, df in frames.items()]
+        else:
+            frames = list(frames)
+
+        columns = [column for df in frames for column in df.columns]
+        if len(columns) != len(set(columns)):
+            raise ValueError("Column names overlap between frames; pass a dict of frames per symbol to prefix them.")
+
+        frames = [df if df.index.is_monotonic_increasing else df.sort_index() for df in frames]
+        index = frames[0].index
+        if how == 'inner' and fill is None:
+            for df in frames[1:]:
+                index = index.intersection(df.index, sort=False)
+        elif how != 'left':
+            # With fill, values are carried onto other frames' dates, so every date is a candidate
+            for df in frames[1:]:
+                index = index.union(df.index)
+        index = index.sort_values()
+
+        method = 'ffill' if fill else None
+        tolerance = pd.Timedelta(tolerance) if tolerance is not None else None
+        aligned = [df if df.index.equals(index) else df.reindex(index, method=method, tolerance=tolerance)
+                   for df in frames]
+        merged = pd.concat(aligned, axis=1)
+
+        if how == 'inner' and fill is not None:
+            # Keep the dates from which on every frame has (possibly carried forward) data
+            start = max(df.index.min() for df in frames)
+            merged = merged[merged.index >= start]
+
+        return merged
+
+    @metrics.timed("processor_stage_seconds", stage="filter_by_date")
     def filter_by_date(self, df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Filter a DataFrame by date range.
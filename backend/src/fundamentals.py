@@ -0,0 +1,315 @@
+import json
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+from .cache_keys import NAMESPACE, KEY_VERSION, normalize_symbol
+from .data_loader import DataLoader
+
+# OVERVIEW fields kept as numbers ("None" and "-" become NaN)
+OVERVIEW_NUMBERS = (
+    "MarketCapitalization", "EBITDA", "PERatio", "PEGRatio", "BookValue", "DividendPerShare", "DividendYield",
+    "EPS", "RevenuePerShareTTM", "ProfitMargin", "OperatingMarginTTM", "ReturnOnAssetsTTM", "ReturnOnEquityTTM",
+    "RevenueTTM", "GrossProfitTTM", "QuarterlyEarningsGrowthYOY", "QuarterlyRevenueGrowthYOY", "ForwardPE",
+    "PriceToSalesRatioTTM", "PriceToBookRatio", "EVToRevenue", "EVToEBITDA", "Beta", "SharesOutstanding",
+)
+# OVERVIEW fields kept as categories, and as plain text
+OVERVIEW_CATEGORIES = ("Exchange", "Currency", "Country", "Sector", "Industry")
+OVERVIEW_TEXT = ("Name",)
+# Fields computed by income_row from the quarterly reports
+INCOME_FIELDS = ("LatestReport", "RevenueTTMReported", "NetIncomeTTM", "GrossMarginTTM", "OperatingMarginTTMReported",
+                 "NetMarginTTM", "RevenueGrowthQOQ", "RevenueGrowthYOY", "NetIncomeGrowthYOY")
+# Reports are consecutive quarters when their fiscal periods end about a quarter apart (within the tolerance)
+QUARTER_DAYS = 365.25 / 4
+QUARTER_TOLERANCE_DAYS = 20
+
+_CONDITION = re.compile(r"^\s*([A-Za-z0-9_]+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$")
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+              "==": operator.eq, "!=": operator.ne}
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def overview_row(overview: dict) -> dict:
+    """
+    Turn an OVERVIEW payload into a row of typed fields.
+    """
+    row = {field: _number(overview.get(field)) for field in OVERVIEW_NUMBERS}
+    row.update({field: overview.get(field) for field in OVERVIEW_CATEGORIES + OVERVIEW_TEXT})
+    return row
+
+
+def income_row(income_statement: dict) -> dict:
+    """
+    Turn an INCOME_STATEMENT payload into a row of trailing-twelve-month figures, margins and growth rates,
+    from its quarterly reports.
+    """
+    reports = sorted(income_statement.get("quarterlyReports", []), key=lambda report: report["fiscalDateEnding"])
+    if not reports:
+        raise ValueError("No data found in the provided JSON.")
+
+    figures = {column: np.array([_number(report.get(column)) for report in reports])
+               for column in ("totalRevenue", "grossProfit", "operatingIncome", "netIncome")}
+    ends = pd.to_datetime([report["fiscalDateEnding"] for report in reports])
+
+    def consecutive(periods: int) -> bool:
+        # Whether the report `periods` quarters before the latest one is really that many quarters older
+        if len(reports) <= periods:
+            return False
+        return abs((ends[-1] - ends[-1 - periods]).days - periods * QUARTER_DAYS) <= QUARTER_TOLERANCE_DAYS
+
+    def ttm(column: str) -> float:
+        # NaN unless all of the last four consecutive quarters are known
+        return float(figures[column][-4:].sum()) if consecutive(3) else np.nan
+
+    def growth(column: str, periods: int) -> float:
+        # Growth from a loss (or from nothing), or against a report of another quarter, has no meaningful rate
+        values = figures[column]
+        if not consecutive(periods) or not values[-1 - periods] > 0:
+            return np.nan
+        return float(values[-1] / values[-1 - periods] - 1)
+
+    revenue_ttm = ttm("totalRevenue")
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            "LatestReport": reports[-1]["fiscalDateEnding"],
+            "RevenueTTMReported": revenue_ttm,
+            "NetIncomeTTM": ttm("netIncome"),
+            "GrossMarginTTM": ttm("grossProfit") / revenue_ttm,
+            "OperatingMarginTTMReported": ttm("operatingIncome") / revenue_ttm,
+            "NetMarginTTM": ttm("netIncome") / revenue_ttm,
+            "RevenueGrowthQOQ": growth("totalRevenue", 1),
+            "RevenueGrowthYOY": growth("totalRevenue", 4),
+            "NetIncomeGrowthYOY": growth("netIncome", 4),
+        }
+
+
+class FundamentalsIndex:
+    """
+    Screening table of the fundamentals of a universe, built from the cached OVERVIEW and
+    INCOME_STATEMENT payloads.
+
+    The typed row of every symbol is kept in Redis (one hash per source), so it is computed once, when
+    the refresh tasks land new data, and shared by every process. Each process keeps the table in memory
+    with a sorted index per numeric column and a bitmap per category value, and reloads it only when
+    the rows in Redis changed, so a screen such as
+
+        index.screen(["PERatio < 15", "RevenueGrowthYOY > 0.1", "Sector == TECHNOLOGY"])
+
+    is a few binary searches and bitwise ANDs.
+    """
+
+    def __init__(self, loader: DataLoader):
+        """
+        Initialize the FundamentalsIndex.
+
+        Args:
+            loader (DataLoader): The loader whose cache and Redis server hold the payloads and the rows.
+        """
+        self.loader = loader
+        self.redis = loader.redis
+
+        prefix = f"{NAMESPACE}:v{KEY_VERSION}:fundamentals"
+        self._keys = {"OVERVIEW": f"{prefix}:overview", "INCOME_STATEMENT": f"{prefix}:income"}
+        self._version_key = f"{prefix}:version"
+
+        self._version = None
+        self._table = None
+        self._sorted = {}
+        self._bitmaps = {}
+
+    def update(self, symbol: str, overview: dict = None, income_statement: dict = None):
+        """
+        Store the rows of a symbol computed from freshly fetched payloads.
+
+        Args:
+            symbol (str): The symbol.
+            overview (dict): The OVERVIEW payload, if it was refreshed.
+            income_statement (dict): The INCOME_STATEMENT payload, if it was refreshed.
+        """
+        self.update_many({symbol: overview} if overview else {}, {symbol: income_statement} if income_statement else {})
+
+    def update_many(self, overviews: dict = None, income_statements: dict = None):
+        """
+        Store the rows computed from freshly fetched payloads, per symbol, in one round trip.
+        Payloads without data (e.g. for unknown symbols) are skipped.
+        """
+        rows = {"OVERVIEW": {}, "INCOME_STATEMENT": {}}
+        for symbol, overview in (overviews or {}).items():
+            if overview and overview.get("Symbol"):
+                rows["OVERVIEW"][normalize_symbol(symbol)] = overview_row(overview)
+        for symbol, income_statement in (income_statements or {}).items():
+            if income_statement and income_statement.get("quarterlyReports"):
+                rows["INCOME_STATEMENT"][normalize_symbol(symbol)] = income_row(income_statement)
+
+        if not rows["OVERVIEW"] and not rows["INCOME_STATEMENT"]:
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for function, function_rows in rows.items():
+            if function_rows:
+                # NaN is not valid JSON; missing numbers are stored as null
+                pipe.hset(self._keys[function], mapping={
+                    symbol: json.dumps({k: None if isinstance(v, float) and np.isnan(v) else v for k, v in row.items()})
+                    for symbol, row in function_rows.items()
+                })
+        pipe.incr(self._version_key)
+        pipe.execute()
+
+    def refresh(self, symbols: list):
+        """
+        Recompute the rows of symbols from the OVERVIEW and INCOME_STATEMENT payloads in the cache
+        (e.g. after a refresh task stored new ones), in one cache round trip.
+        """
+        symbols = [normalize_symbol(symbol) for symbol in symbols]
+        params_list = [{"function": function, "symbol": symbol}
+                       for function in ("OVERVIEW", "INCOME_STATEMENT") for symbol in symbols]
+        cached = self.loader.cache_get_many(params_list)
+        self.update_many(dict(zip(symbols, cached[:len(symbols)])), dict(zip(symbols, cached[len(symbols):])))
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """
+        The screening table: one row per symbol with the OVERVIEW and INCOME_STATEMENT fields and the
+        ratios derived from both. Reloaded from Redis only when rows changed since the last load.
+        """
+        version = self.redis.get(self._version_key)
+        if self._table is None or version != self._version:
+            self._table = self._load()
+            self._version = version
+            self._sorted = {}
+            self._bitmaps = {}
+        return self._table
+
+    def _load(self) -> pd.DataFrame:
+        """
+        Private method to build the table from the rows stored in Redis.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for key in self._keys.values():
+            pipe.hgetall(key)
+        frames = []
+        for rows in pipe.execute():
+            frame = pd.DataFrame.from_dict({symbol.decode(): json.loads(row) for symbol, row in rows.items()},
+                                           orient='index')
+            frames.append(frame)
+
+        table = pd.concat(frames, axis=1).sort_index()
+        if table.empty:
+            # Nothing stored yet: keep the columns, so screens return no rows instead of failing
+            table = pd.DataFrame(columns=list(OVERVIEW_NUMBERS + OVERVIEW_CATEGORIES + OVERVIEW_TEXT + INCOME_FIELDS))
+        table.index.name = 'Symbol'
+        for field in OVERVIEW_NUMBERS + INCOME_FIELDS[1:]:
+            if field in table.columns:
+                table[field] = pd.to_numeric(table[field], errors='coerce').astype(np.float64)
+        for field in OVERVIEW_CATEGORIES:
+            if field in table.columns:
+                table[field] = table[field].astype('category')
+
+        # Ratios combining both sources
+        if "MarketCapitalization" in table.columns and "RevenueTTMReported" in table.columns:
+            table["PriceToSalesReported"] = table["MarketCapitalization"] / table["RevenueTTMReported"]
+        if "PERatio" in table.columns:
+            table["EarningsYield"] = 1 / table["PERatio"].where(table["PERatio"] > 0)
+        return table
+
+    def _sorted_index(self, column: str) -> tuple:
+        """
+        Private method to get the row positions of a numeric column in increasing order of its values,
+        the sorted values and the number of non-NaN values (NaN sort last).
+        """
+        if column not in self._sorted:
+            values = self._table[column].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind='stable')
+            self._sorted[column] = (order, values[order], int((~np.isnan(values)).sum()))
+        return self._sorted[column]
+
+    def _bitmap(self, column: str, value: str) -> np.ndarray:
+        """
+        Private method to get the rows whose category column equals value.
+        """
+        bitmaps = self._bitmaps.get(column)
+        if bitmaps is None:
+            codes = self._table[column].cat.codes.to_numpy()
+            bitmaps = self._bitmaps[column] = {category: codes == code
+                                               for code, category in enumerate(self._table[column].cat.categories)}
+        return bitmaps.get(value, np.zeros(len(self._table), dtype=bool))
+
+    def _match(self, condition: str) -> np.ndarray:
+        """
+        Private method to get the rows matching a condition such as "PERatio < 15", as a boolean bitmap.
+        """
+        parsed = _CONDITION.match(condition)
+        if not parsed:
+            raise ValueError(f"Invalid condition: {condition}")
+        column, op, value = parsed.groups()
+        table = self._table
+        if column not in table.columns:
+            raise ValueError(f"Unknown column: {column}")
+
+        if isinstance(table[column].dtype, pd.CategoricalDtype):
+            if op not in ("==", "!="):
+                raise ValueError(f"Only == and != apply to {column}.")
+            value = value.strip("'\"")
+            bitmap = self._bitmap(column, value)
+            return bitmap if op == "==" else ~bitmap & table[column].notna().to_numpy()
+
+        if not pd.api.types.is_numeric_dtype(table[column]):
+            return _OPERATORS[op](table[column], value.strip("'\"")).to_numpy()
+
+        value = float(value)
+        order, sorted_values, valid = self._sorted_index(column)
+        sorted_values = sorted_values[:valid]
+        if op in ("<", "<="):
+            positions = order[:np.searchsorted(sorted_values, value, side='left' if op == "<" else 'right')]
+        elif op in (">", ">="):
+            positions = order[np.searchsorted(sorted_values, value, side='right' if op == ">" else 'left'):valid]
+        else:
+            start, end = np.searchsorted(sorted_values, value, 'left'), np.searchsorted(sorted_values, value, 'right')
+            positions = order[start:end] if op == "==" else np.concatenate([order[:start], order[end:valid]])
+
+        bitmap = np.zeros(len(table), dtype=bool)
+        bitmap[positions] = True
+        return bitmap
+
+    def screen(self, conditions: list, sort_by: str = None, ascending: bool = True, limit: int = None,
+               columns: list = None) -> pd.DataFrame:
+        """
+        Get the symbols matching every condition.
+
+        Args:
+            conditions (list): Conditions of the form "<column> <op> <value>" with op one of < <= > >= == !=,
+                e.g. ["PERatio < 15", "RevenueGrowthYOY > 0.1", "Sector == TECHNOLOGY"]. Missing values never match.
+            sort_by (str): The numeric column to sort the matches by (default: by symbol).
+            ascending (bool): The sort order (default: True); missing values sort last either way.
+            limit (int): The maximum number of rows to return (default: all).
+            columns (list): The columns to return (default: all).
+
+        Returns:
+            pd.DataFrame: The matching rows, indexed by symbol.
+        """
+        table = self.table
+        bitmap = np.ones(len(table), dtype=bool)
+        for condition in conditions:
+            bitmap &= self._match(condition)
+
+        if sort_by is None:
+            positions = np.flatnonzero(bitmap)
+        else:
+            order, _, valid = self._sorted_index(sort_by)
+            ranked = order[:valid] if ascending else order[:valid][::-1]
+            positions = np.concatenate([ranked, order[valid:]])
+            positions = positions[bitmap[positions]]
+
+        if limit is not None:
+            positions = positions[:limit]
+        result = table.iloc[positions]
+        return result[columns] if columns else result
+
@@ -0,0 +1,284 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .config import history_dir, parquet_history_dir
+
+
+class HistoryStore:
+    """
+    Local store of processed per-symbol history (one pickled DataFrame per symbol), so daily
+    refreshes only need to fetch and process the newest bars.
+    """
+
+    def __init__(self, root_dir: str = history_dir):
+        """
+        Initialize the HistoryStore.
+
+        Args:
+            root_dir (str): The directory holding the history files (default: data/history).
+        """
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"{symbol}.pkl")
+
+    def symbols(self) -> list:
+        """
+        Get the symbols with a stored history.
+        """
+        return sorted(name[:-len(".pkl")] for name in os.listdir(self.root_dir) if name.endswith(".pkl"))
+
+    def load(self, symbol: str) -> pd.DataFrame | None:
+        """
+        Load the stored history of a symbol.
+
+        Returns:
+            pd.DataFrame: The history sorted by date, or None if nothing is stored for the symbol.
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def save(self, symbol: str, df: pd.DataFrame):
+        """
+        Replace the stored history of a symbol.
+        """
+        # Write to a temporary file first so readers never see a partially written history
+        path = self._path(symbol)
+        df.sort_index().to_pickle(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    def append(self, symbol: str, new_rows: pd.DataFrame):
+        """
+        Add rows to the stored history of a symbol, replacing stored rows with the same dates.
+        """
+        history = self.load(symbol)
+        if history is not None:
+            new_rows = pd.concat([history[~history.index.isin(new_rows.index)], new_rows])
+        self.save(symbol, new_rows)
+
+    def load_tail(self, symbol: str, rows: int) -> pd.DataFrame | None:
+        """
+        Load the newest rows of the stored history of a symbol, or None if nothing is stored.
+        """
+        history = self.load(symbol)
+        return None if history is None else history.iloc[-rows:]
+
+    def last_date(self, symbol: str) -> pd.Timestamp | None:
+        """
+        Get the date of the newest stored row of a symbol, or None if nothing is stored.
+        """
+        history = self.load(symbol)
+        if history is None or history.empty:
+            return None
+        return history.index.max()
+
+
+class ParquetHistoryStore:
+    """
+    Columnar store of processed per-symbol history, as Parquet files partitioned by symbol and year:
+
+        <root_dir>/symbol=AAPL/year=2024/data.parquet
+
+    Reads only open the partitions overlapping the requested date window, push the date filter and
+    the column selection down to the Parquet reader, and memory-map the files.
+    """
+
+    INDEX_COLUMN = 'Date'
+
+    def __init__(self, root_dir: str = parquet_history_dir):
+        """
+        Initialize the ParquetHistoryStore.
+
+        Args:
+            root_dir (str): The directory holding the partitions (default: data/history_parquet).
+                Histories kept by a HistoryStore can be copied over with migrate.
+        """
+        if pa is None:
+            raise ImportError("ParquetHistoryStore requires the pyarrow package.")
+
+        self.root_dir = root_dir
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def symbols(self) -> list:
+        """
+        Get the symbols with a stored history.
+        """
+        return sorted(name.split('=', 1)[1] for name in os.listdir(self.root_dir) if name.startswith('symbol='))
+
+    def migrate(self, source: HistoryStore, overwrite: bool = False) -> list:
+        """
+        Copy the histories of a HistoryStore (e.g. HistoryStore() for the pickles in data/history) into this store.
+
+        Args:
+            source (HistoryStore): The store to copy from.
+            overwrite (bool): Replace the histories already in this store (default: False, skip them).
+
+        Returns:
+            list: The symbols copied.
+        """
+        migrated = []
+        for symbol in source.symbols():
+            if not overwrite and self._years(symbol):
+                continue
+            self.save(symbol, source.load(symbol))
+            migrated.append(symbol)
+        return migrated
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, f"symbol={symbol}")
+
+    def _years(self, symbol: str) -> list:
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(int(name.split('=', 1)[1]) for name in os.listdir(symbol_dir) if name.startswith('year='))
+
+    def _partition_path(self, symbol: str, year: int) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"year={year}", "data.parquet")
+
+    def _to_frame(self, table: pa.Table) -> pd.DataFrame:
+        df = table.to_pandas().set_index(self.INDEX_COLUMN).sort_index()
+        df.index.name = None
+        return df
+
+    def read(self, symbol: str, start_date: str = None, end_date: str = None, columns: list = None) -> pd.DataFrame | None:
+        """
+        Read the stored history of a symbol, optionally restricted to a date window and a set of columns.
+
+        Args:
+            symbol (str): The symbol to read.
+            start_date (str): The start date in 'YYYY-MM-DD' format (inclusive, like DataProcessor.filter_by_date).
+            end_date (str): The end date in 'YYYY-MM-DD' format (inclusive).
+            columns (list): The columns to read (default: all).
+
+        Returns:
+            pd.DataFrame: The history sorted by date, or None if nothing is stored for the symbol.
+        """
+        years = self._years(symbol)
+        start = pd.Timestamp(start_date) if start_date else None
+        end = pd.Timestamp(end_date) if end_date else None
+        years = [year for year in years if (start is None or year >= start.year) and (end is None or year <= end.year)]
+        if not years:
+            return None if not self._years(symbol) else self._empty_frame(symbol, columns)
+
+        dataset = ds.dataset([self._partition_path(symbol, year) for year in years], format='parquet',
+                             filesystem=self.filesystem)
+        index = ds.field(self.INDEX_COLUMN)
+        row_filter = None
+        if start is not None:
+            row_filter = index >= pa.scalar(start, type=dataset.schema.field(self.INDEX_COLUMN).type)
+        if end is not None:
+            end_filter = index <= pa.scalar(end, type=dataset.schema.field(self.INDEX_COLUMN).type)
+            row_filter = end_filter if row_filter is None else row_filter & end_filter
+
+        read_columns = None if columns is None else [self.INDEX_COLUMN] + [c for c in columns if c != self.INDEX_COLUMN]
+        return self._to_frame(dataset.to_table(columns=read_columns, filter=row_filter))
+
+    def _empty_frame(self, symbol: str, columns: list = None) -> pd.DataFrame:
+        df = self._to_frame(pq.read_schema(self._partition_path(symbol, self._years(symbol)[0])).empty_table())
+        return df if columns is None else df[[c for c in columns if c != self.INDEX_COLUMN]]
+
+    def read_many(self, symbols: list, start_date: str = None, end_date: str = None, columns: list = None) -> dict:
+        """
+        Read the stored history of several symbols. See read.
+
+        Returns:
+            dict: The history per symbol, for the symbols that have one.
+        """
+        frames = {symbol: self.read(symbol, start_date, end_date, columns) for symbol in symbols}
+        return {symbol: df for symbol, df in frames.items() if df is not None}
+
+    def load(self, symbol: str) -> pd.DataFrame | None:
+        """
+        Load the whole stored history of a symbol.
+
+        Returns:
+            pd.DataFrame: The history sorted by date, or None if nothing is stored for the symbol.
+        """
+        return self.read(symbol)
+
+    def load_tail(self, symbol: str, rows: int) -> pd.DataFrame | None:
+        """
+        Load the newest rows of the stored history of a symbol, reading only the newest partitions.
+
+        Returns:
+            pd.DataFrame: At most rows rows sorted by date, or None if nothing is stored for the symbol.
+        """
+        frames = []
+        count = 0
+        for year in reversed(self._years(symbol)):
+            table = pq.read_table(self._partition_path(symbol, year), memory_map=True)
+            frames.append(table)
+            count += table.num_rows
+            if count >= rows:
+                break
+
+        if not frames:
+            return None
+        return self._to_frame(pa.concat_tables(reversed(frames))).iloc[-rows:]
+
+    def save(self, symbol: str, df: pd.DataFrame):
+        """
+        Replace the stored history of a symbol.
+        """
+        years = set(df.index.year)
+        for year in self._years(symbol):
+            if year not in years:
+                os.remove(self._partition_path(symbol, year))
+                os.rmdir(os.path.dirname(self._partition_path(symbol, year)))
+        self._write_years(symbol, df)
+
+    def append(self, symbol: str, new_rows: pd.DataFrame):
+        """
+        Add rows to the stored history of a symbol, replacing stored rows with the same dates.
+        Only the partitions of the years the new rows fall in are rewritten.
+        """
+        stored_years = set(self._years(symbol))
+        frames = []
+        for year in sorted(set(new_rows.index.year)):
+            rows = new_rows[new_rows.index.year == year]
+            if year in stored_years:
+                stored = self._to_frame(pq.read_table(self._partition_path(symbol, year)))
+                rows = pd.concat([stored[~stored.index.isin(rows.index)], rows])
+            frames.append(rows)
+
+        if frames:
+            self._write_years(symbol, pd.concat(frames))
+
+    def _write_years(self, symbol: str, df: pd.DataFrame):
+        """
+        Private method to write one partition per year of df, each replacing the stored one atomically.
+        """
+        df = df.sort_index()
+        for year in sorted(set(df.index.year)):
+            rows = df[df.index.year == year]
+            table = pa.Table.from_pandas(rows.rename_axis(self.INDEX_COLUMN).reset_index(), preserve_index=False)
+
+            path = self._partition_path(symbol, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(table, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+    def last_date(self, symbol: str) -> pd.Timestamp | None:
+        """
+        Get the date of the newest stored row of a symbol, or None if nothing is stored.
+        """
+        years = self._years(symbol)
+        if not years:
+            return None
+        dates = pq.read_table(self._partition_path(symbol, years[-1]), columns=[self.INDEX_COLUMN])
+        return pd.Timestamp(pc.max(dates[self.INDEX_COLUMN]).as_py())
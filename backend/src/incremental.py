@@ -0,0 +1,109 @@
+import logging
+
+import pandas as pd
+
+from .data_loader import DataLoader
+from .data_processor import DataProcessor
+from .history_store import HistoryStore, ParquetHistoryStore, pa
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalUpdater:
+    """
+    Keep processed per-symbol time series up to date by fetching only what is new.
+
+    Symbols whose stored history is recent enough are refreshed with outputsize=compact (the latest
+    100 bars) instead of the full series; only bars from the last stored date onwards are merged in,
+    and the derived columns are extended from the end of the history instead of being recomputed.
+    """
+
+    # outputsize=compact returns the latest 100 trading days, roughly 140 calendar days
+    COMPACT_MAX_AGE = pd.Timedelta(days=120)
+
+    def __init__(self, loader: DataLoader, processor: DataProcessor = None,
+                 store: HistoryStore | ParquetHistoryStore = None,
+                 function: str = "TIME_SERIES_DAILY", nested_key: str = "Time Series (Daily)", window: int = 20):
+        """
+        Initialize the IncrementalUpdater.
+
+        Args:
+            loader (DataLoader): The loader used to fetch the time series.
+            processor (DataProcessor): The processor used to parse and extend the data (default: DataProcessor()).
+            store (HistoryStore or ParquetHistoryStore): The store holding the processed history
+                (default: ParquetHistoryStore() when pyarrow is installed, otherwise HistoryStore()).
+            function (str): The Alpha Vantage time series function (default: "TIME_SERIES_DAILY").
+            nested_key (str): The key of the time series in the payload (default: "Time Series (Daily)").
+            window (int): The window size of the moving average (default: 20).
+        """
+        self.loader = loader
+        self.processor = processor or DataProcessor()
+        self.store = store or (ParquetHistoryStore() if pa is not None else HistoryStore())
+        self.function = function
+        self.nested_key = nested_key
+        self.window = window
+
+    def update(self, symbols: list, now: pd.Timestamp = None) -> dict:
+        """
+        Bring the stored history of several symbols up to date.
+
+        Args:
+            symbols (list): The symbols to update.
+            now (pd.Timestamp): The current time, used to decide whether a history is recent enough (default: now).
+
+        Returns:
+            dict: The number of new dates added per symbol. A symbol that failed to fetch or update maps to
+                the exception raised instead; the other symbols are still updated.
+        """
+        now = now or pd.Timestamp.now()
+        # Extending the derived columns only needs the last window rows of each history, and at least the
+        # row before the last one, which is fetched again and replaced (see _merge)
+        histories = {symbol: self.store.load_tail(symbol, max(self.window, 2)) for symbol in symbols}
+
+        compact = [symbol for symbol, history in histories.items()
+                   if history is not None and not history.empty and now - history.index.max() <= self.COMPACT_MAX_AGE]
+        full = [symbol for symbol in symbols if symbol not in compact]
+
+        payloads = {}
+        if compact:
+            payloads.update(self.loader.get_bulk_data(compact, self.function, outputsize="compact",
+                                                      return_exceptions=True))
+        if full:
+            payloads.update(self.loader.get_bulk_data(full, self.function, outputsize="full", return_exceptions=True))
+
+        added = {}
+        for symbol in symbols:
+            try:
+                if isinstance(payloads[symbol], Exception):
+                    raise payloads[symbol]
+                df = self.processor.parse_time_series(payloads[symbol], self.nested_key)
+                df = self.processor.clean_stock_data(df).sort_index()
+                added[symbol] = self._merge(symbol, histories[symbol], df)
+            except Exception as e:
+                logger.warning("Incremental update failed for %s: %s", symbol, e)
+                added[symbol] = e
+
+        return added
+
+    def _merge(self, symbol: str, history: pd.DataFrame | None, df: pd.DataFrame) -> int:
+        """
+        Private method to merge freshly fetched bars into the stored history of a symbol.
+        """
+        if history is None or history.empty:
+            df = self.processor.calculate_returns(df)
+            df = self.processor.calculate_moving_average(df, window=self.window)
+            self.store.save(symbol, df)
+            return len(df)
+
+        # The last stored bar is fetched again, as it may have been stored before the session closed
+        last_date = history.index.max()
+        new_rows = df[df.index >= last_date]
+        if new_rows.empty:
+            return 0
+
+        history = history[history.index < new_rows.index.min()]
+        new_rows = self.processor.extend_returns(history, new_rows)
+        new_rows = self.processor.extend_moving_average(history, new_rows, window=self.window)
+        self.store.append(symbol, new_rows)
+
+        return int((new_rows.index > last_date).sum())
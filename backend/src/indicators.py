@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Indicator name -> name of its column
+INDICATORS = {
+    "sma": "SMA {window}",
+    "ema": "EMA {window}",
+    "log_return": "Log Return",
+    "volatility": "Volatility {window}",
+    "drawdown": "Drawdown",
+    "vwap": "VWAP",
+}
+# Indicators that need a window; VWAP takes an optional one (cumulative without it)
+WINDOWED = ("sma", "ema", "volatility")
+
+
+def parse_indicator(spec: str | tuple) -> tuple:
+    """
+    Parse an indicator spec such as "sma:20", ("ema", 50), "log_return" or "vwap:20" (a rolling VWAP).
+
+    Returns:
+        tuple: The (name, window) of the indicator; window is None when not given.
+    """
+    if isinstance(spec, str):
+        name, _, window = spec.partition(":")
+        spec = (name, int(window) if window else None)
+
+    name, window = spec[0].strip().lower(), (spec[1] if len(spec) > 1 else None)
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {name}")
+    if name in WINDOWED and not window:
+        raise ValueError(f"The {name} indicator needs a window, e.g. '{name}:20'.")
+    if window is not None and window < (2 if name == "volatility" else 1):
+        raise ValueError(f"Invalid window for {name}: {window}")
+    return name, window
+
+
+def column_name(name: str, window: int = None) -> str:
+    if name == "vwap" and window:
+        return f"VWAP {window}"
+    return INDICATORS[name].format(window=window)
+
+
+class _Sums:
+    """
+    Cumulative sums of a series (ignoring NaN) and of its valid-value count, from which the sum over any
+    trailing window is a single subtraction; shared by every window of the same series.
+    """
+
+    def __init__(self, values: np.ndarray):
+        valid = ~np.isnan(values)
+        self.sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+        self.counts = np.concatenate(([0], np.cumsum(valid)))
+
+    def window(self, window: int) -> tuple:
+        """
+        Get the sum and the number of valid values of the trailing window ending at every position.
+        """
+        n = len(self.sums) - 1
+        ends = np.arange(1, n + 1)
+        starts = np.maximum(ends - window, 0)
+        return self.sums[ends] - self.sums[starts], self.counts[ends] - self.counts[starts]
+
+
+def _rolling_mean(sums: _Sums, window: int) -> np.ndarray:
+    total, count = sums.window(window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count == window, total / window, np.nan)
+
+
+def _ema(values: np.ndarray, window: int) -> np.ndarray:
+    # Same recursion as pandas' ewm(span=window, adjust=False), run by pandas' compiled kernel
+    return pd.Series(values).ewm(span=window, adjust=False, min_periods=window).mean().to_numpy()
+
+
+def compute_indicators(df: pd.DataFrame, indicators: list, price_column: str = 'Close') -> dict:
+    """
+    Compute several indicators of a time series in one pass over its NumPy arrays.
+
+    Rolling sums are computed once per series (prices, log returns, squared log returns, traded value)
+    and every window is then derived from them, so asking for more windows costs one subtraction each.
+
+    Args:
+        df (pd.DataFrame): The time series, sorted by date.
+        indicators (list): The indicator specs (see parse_indicator).
+        price_column (str): The column containing the price data (default: 'Close').
+
+    Returns:
+        dict: The values (NumPy arrays) of each indicator, by column name.
+    """
+    prices = df[price_column].to_numpy(dtype=np.float64)
+    specs = [parse_indicator(spec) for spec in indicators]
+    names = {name for name, _ in specs}
+
+    price_sums = _Sums(prices) if "sma" in names else None
+    log_returns = None
+    if names & {"log_return", "volatility"}:
+        log_returns = np.empty_like(prices)
+        log_returns[0] = np.nan
+        with np.errstate(invalid="ignore", divide="ignore"):
+            log_returns[1:] = np.log(prices[1:] / prices[:-1])
+    return_sums = _Sums(log_returns) if "volatility" in names else None
+    squared_sums = _Sums(log_returns ** 2) if "volatility" in names else None
+
+    vwap_sums = None
+    if "vwap" in names:
+        if 'Volume' not in df.columns:
+            raise ValueError("VWAP needs a 'Volume' column.")
+        # The typical price of each bar when high and low are known, otherwise the price
+        typical = prices
+        if 'High' in df.columns and 'Low' in df.columns:
+            typical = (df['High'].to_numpy(dtype=np.float64) + df['Low'].to_numpy(dtype=np.float64) + prices) / 3
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        vwap_sums = (_Sums(typical * volume), _Sums(volume))
+
+    results = {}
+    for name, window in specs:
+        if name == "sma":
+            values = _rolling_mean(price_sums, window)
+        elif name == "ema":
+            values = _ema(prices, window)
+        elif name == "log_return":
+            values = log_returns
+        elif name == "volatility":
+            # Sample standard deviation of the log returns over the window
+            total, count = return_sums.window(window)
+            squares, _ = squared_sums.window(window)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                variance = np.maximum((squares - total ** 2 / window) / (window - 1), 0.0)
+            values = np.where(count == window, np.sqrt(variance), np.nan)
+        elif name == "drawdown":
+            values = prices / np.fmax.accumulate(prices) - 1
+        else:
+            traded, volume = vwap_sums
+            traded_total, _ = traded.window(window or len(prices))
+            volume_total, count = volume.window(window or len(prices))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = traded_total / volume_total
+            if window:
+                values = np.where(count == window, values, np.nan)
+        results[column_name(name, window)] = values
+
+    return results
+
+
+def downcast(df: pd.DataFrame, categorical_threshold: float = 0.5) -> pd.DataFrame:
+    """
+    Shrink a frame: float64 columns become float32, integer columns the smallest integer type holding
+    their values, and text columns with few distinct values (at most categorical_threshold of the rows)
+    become categoricals.
+
+    Returns:
+        pd.DataFrame: The downcast frame.
+    """
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[column] = np.float32
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[column] = pd.to_numeric(df[column], downcast='integer').dtype
+        elif (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) and len(df) \
+                and df[column].nunique() <= categorical_threshold * len(df):
+            dtypes[column] = 'category'
+    return df.astype(dtypes) if dtypes else df
@@ -0,0 +1,223 @@
+import functools
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (in seconds) of the histogram buckets, from 1 ms to 2 minutes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _series_key(name: str, tags: dict) -> tuple:
+    return name, tuple(sorted(tags.items())) if tags else ()
+
+
+class InMemorySink:
+    """
+    Metrics sink keeping counters and histograms in memory, e.g. for tests or for a report at the end of a run.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: float, tags: dict):
+        key = _series_key(name, tags)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, tags: dict):
+        key = _series_key(name, tags)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets)}
+            histogram["count"] += 1
+            histogram["sum"] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+                    break
+
+    def counter(self, name: str, **tags) -> float:
+        """
+        Get the total of a counter, summed over all tag combinations matching tags.
+        """
+        with self._lock:
+            return sum(value for (series, series_tags), value in self.counters.items()
+                       if series == name and set(tags.items()) <= set(series_tags))
+
+    def histogram(self, name: str, **tags) -> dict:
+        """
+        Get the count and sum of a histogram, summed over all tag combinations matching tags.
+        """
+        with self._lock:
+            matching = [histogram for (series, series_tags), histogram in self.histograms.items()
+                        if series == name and set(tags.items()) <= set(series_tags)]
+            return {"count": sum(h["count"] for h in matching), "sum": sum(h["sum"] for h in matching)}
+
+    def cache_hit_ratio(self) -> float:
+        """
+        Get the share of cache lookups that were hits (local and Redis tiers combined).
+        """
+        hits = self.counter("cache_hits")
+        lookups = hits + self.counter("cache_misses")
+        return hits / lookups if lookups else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class PrometheusSink(InMemorySink):
+    """
+    In-memory sink that renders its metrics in the Prometheus text exposition format,
+    e.g. to be served from a /metrics endpoint.
+    """
+
+    def __init__(self, namespace: str = "marketfundamentals", buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(buckets)
+        self.namespace = namespace
+
+    def render(self) -> str:
+        """
+        Render every counter and histogram in the Prometheus text format.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+
+        typed = set()
+        for (name, tags), value in counters:
+            metric = f"{self.namespace}_{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{self._labels(tags)} {value}")
+
+        for (name, tags), histogram in histograms:
+            metric = f"{self.namespace}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram["buckets"]):
+                cumulative += count
+                lines.append(f"{metric}_bucket{self._labels(tags, le=bound)} {cumulative}")
+            lines.append(f"{metric}_bucket{self._labels(tags, le='+Inf')} {histogram['count']}")
+            lines.append(f"{metric}_sum{self._labels(tags)} {histogram['sum']}")
+            lines.append(f"{metric}_count{self._labels(tags)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(tags: tuple, **extra) -> str:
+        labels = list(tags) + list(extra.items())
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class StatsDSink:
+    """
+    Sink sending every measurement to a StatsD daemon over UDP (tags in the DogStatsD "|#key:value" form).
+    Sending never blocks or fails the caller.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 8125, prefix: str = "marketfundamentals"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def count(self, name: str, value: float, tags: dict):
+        self._send(f"{self.prefix}.{name}:{value}|c{self._tags(tags)}")
+
+    def observe(self, name: str, value: float, tags: dict):
+        # StatsD timers are in milliseconds; byte counts and other values are sent as histograms
+        if name.endswith("_seconds"):
+            self._send(f"{self.prefix}.{name[:-len('_seconds')]}:{value * 1000:.3f}|ms{self._tags(tags)}")
+        else:
+            self._send(f"{self.prefix}.{name}:{value}|h{self._tags(tags)}")
+
+    @staticmethod
+    def _tags(tags: dict) -> str:
+        if not tags:
+            return ""
+        return "|#" + ",".join(f"{key}:{value}" for key, value in sorted(tags.items()))
+
+    def _send(self, line: str):
+        try:
+            self._socket.sendto(line.encode(), self.address)
+        except OSError:
+            pass
+
+    def close(self):
+        self._socket.close()
+
+
+class Metrics:
+    """
+    Entry point of the instrumentation: counters, histograms and timers forwarded to a pluggable sink.
+    """
+
+    def __init__(self, sink=None):
+        """
+        Initialize the Metrics.
+
+        Args:
+            sink: The sink receiving the measurements (default: an InMemorySink).
+        """
+        self.sink = sink if sink is not None else InMemorySink()
+
+    def set_sink(self, sink):
+        """
+        Send all further measurements to sink.
+        """
+        self.sink = sink
+
+    def incr(self, name: str, value: float = 1, **tags):
+        """
+        Add value to the counter name.
+        """
+        self.sink.count(name, value, tags)
+
+    def observe(self, name: str, value: float, **tags):
+        """
+        Record value in the histogram name.
+        """
+        self.sink.observe(name, value, tags)
+
+    @contextmanager
+    def timer(self, name: str, **tags):
+        """
+        Record the duration of the with block, in seconds, in the histogram name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sink.observe(name, time.perf_counter() - start, tags)
+
+    def timed(self, name: str, **tags):
+        """
+        Decorator recording the duration of every call, in seconds, in the histogram name.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.sink.observe(name, time.perf_counter() - start, tags)
+            return wrapper
+        return decorator
+
+
+# Shared by DataLoader, DataProcessor and DataOutput; call metrics.set_sink(...) to export elsewhere
+metrics = Metrics()
@@ -0,0 +1,259 @@
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from .data_loader import DataLoader
+from .data_output import DataOutput
+from .data_processor import DataProcessor
+from .indicators import parse_indicator
+
+# Cleaned column -> field of the Alpha Vantage bars it comes from
+RAW_FIELDS = {'Open': '1. open', 'High': '2. high', 'Low': '3. low', 'Close': '4. close', 'Volume': '5. volume'}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class PipelinePlan:
+    """
+    What a Pipeline computes for every symbol; sent to the worker processes.
+    """
+    function: str = "TIME_SERIES_DAILY"
+    nested_key: str = None
+    start_date: str = None
+    end_date: str = None
+    columns: tuple = None
+    indicators: tuple = ()
+    price_column: str = 'Close'
+    downcast: bool = False
+
+    def lookback(self) -> int | None:
+        """
+        The number of bars before start_date the indicators need to be exact from start_date on,
+        or None when they need the whole history: EMA, drawdown (from the running peak) and the
+        cumulative VWAP depend on every earlier bar.
+        """
+        rows = 0
+        for name, window in map(parse_indicator, self.indicators):
+            if name in ("ema", "drawdown") or (name == "vwap" and not window):
+                return None
+            if name == "volatility":
+                rows = max(rows, window + 1)
+            elif window:
+                rows = max(rows, window)
+            elif name == "log_return":
+                rows = max(rows, 1)
+        return rows
+
+    def fields(self) -> list | None:
+        """
+        The bar fields to parse, or None for all of them.
+        """
+        if self.columns is None:
+            return None
+        needed = set(self.columns) | {self.price_column}
+        if any(parse_indicator(spec)[0] == "vwap" for spec in self.indicators):
+            needed |= {'High', 'Low', 'Volume'}
+        if not needed <= set(RAW_FIELDS):
+            return None
+        return [field for column, field in RAW_FIELDS.items() if column in needed]
+
+
+def prune_payload(data: dict, plan: PipelinePlan) -> tuple:
+    """
+    Keep only the bars of a time series payload in the plan's date window (plus the indicators' lookback)
+    and only the fields the plan needs, before anything is parsed.
+
+    Returns:
+        tuple: The nested key of the time series and the pruned payload, or (None, None) without any bar.
+    """
+    nested_key = plan.nested_key or next((key for key in data if "Time Series" in key), None)
+    series = data.get(nested_key) or {} if nested_key else {}
+
+    dates = sorted(series)
+    start = bisect_left(dates, plan.start_date) if plan.start_date else 0
+    end = bisect_right(dates, plan.end_date) if plan.end_date else len(dates)
+    lookback = plan.lookback()
+    dates = dates[max(start - lookback, 0) if lookback is not None else 0:end]
+    if not dates or start >= end:
+        return None, None
+
+    fields = plan.fields()
+    if fields is not None and not all(field in series[dates[0]] for field in fields):
+        fields = None
+    if fields is None:
+        bars = {date: series[date] for date in dates}
+    else:
+        bars = {date: {field: series[date][field] for field in fields} for date in dates}
+    return nested_key, {nested_key: bars}
+
+
+def process_payload(nested_key: str, payload: dict, plan: PipelinePlan) -> pd.DataFrame:
+    """
+    Parse, clean and process a pruned payload (run in the worker processes).
+
+    Returns:
+        pd.DataFrame: The processed bars of the plan's date window.
+    """
+    processor = DataProcessor()
+    df = processor.clean_stock_data(processor.parse_time_series(payload, nested_key)).sort_index()
+    if plan.indicators:
+        df = processor.calculate_indicators(df, list(plan.indicators), plan.price_column)
+    if plan.start_date or plan.end_date:
+        df = processor.filter_by_date(df, plan.start_date or df.index.min(), plan.end_date or df.index.max())
+    if plan.columns is not None:
+        indicator_columns = [column for column in df.columns if column not in RAW_FIELDS]
+        df = df[list(dict.fromkeys(list(plan.columns) + indicator_columns))]
+    if plan.downcast:
+        df = processor.downcast(df)
+    return df
+
+
+class Pipeline:
+    """
+    Lazy fetch -> parse -> process -> export pipeline over a universe of symbols.
+
+    Building a pipeline only records a plan; run() executes it:
+
+        results = (Pipeline(loader, output=DataOutput("output"))
+                   .fetch(symbols, "TIME_SERIES_DAILY")
+                   .between("2024-01-01", "2024-12-31")
+                   .select(["Close", "Volume"])
+                   .indicators(["sma:20", "sma:50", "volatility:20"])
+                   .export(["csv", "parquet"])
+                   .run())
+
+    The date window and the column selection are pushed down ahead of parsing (only the bars in the window,
+    plus what the indicators need to warm up, and only the needed fields are parsed), so the results are the
+    same as processing every bar and filtering afterwards. Fetching, processing and exporting overlap: every
+    payload is handed to a process pool as soon as it is fetched and every processed symbol is exported as
+    soon as it is ready, so a run takes about as long as its slowest stage.
+    """
+
+    def __init__(self, loader: DataLoader, output: DataOutput = None, plan: PipelinePlan = None,
+                 symbols: tuple = (), formats: tuple = (), prefix: str = ""):
+        """
+        Initialize the Pipeline.
+
+        Args:
+            loader (DataLoader): The loader fetching the time series.
+            output (DataOutput): The output the processed symbols are exported to (needed by export()).
+        """
+        self.loader = loader
+        self.output = output
+        self.plan = plan or PipelinePlan()
+        self.symbols = tuple(symbols)
+        self.formats = tuple(formats)
+        self.prefix = prefix
+
+    def _with(self, plan: PipelinePlan = None, **changes) -> "Pipeline":
+        attributes = {"loader": self.loader, "output": self.output, "plan": plan or self.plan,
+                      "symbols": self.symbols, "formats": self.formats, "prefix": self.prefix}
+        attributes.update(changes)
+        return Pipeline(**attributes)
+
+    def fetch(self, symbols: list, function: str = "TIME_SERIES_DAILY", nested_key: str = None) -> "Pipeline":
+        """
+        Fetch a time series function for symbols.
+        """
+        return self._with(dataclasses.replace(self.plan, function=function, nested_key=nested_key), symbols=symbols)
+
+    def between(self, start_date: str = None, end_date: str = None) -> "Pipeline":
+        """
+        Keep the bars from start_date to end_date ('YYYY-MM-DD', both inclusive). Only the bars the indicators
+        need before start_date are parsed, or the whole history for EMA, drawdown and the cumulative VWAP.
+        """
+        return self._with(dataclasses.replace(self.plan, start_date=start_date, end_date=end_date))
+
+    def select(self, columns: list) -> "Pipeline":
+        """
+        Keep these cleaned columns (e.g. ['Close', 'Volume']); indicator columns are always kept.
+        """
+        return self._with(dataclasses.replace(self.plan, columns=tuple(columns)))
+
+    def indicators(self, indicators: list, price_column: str = 'Close') -> "Pipeline":
+        """
+        Add indicator columns (see DataProcessor.calculate_indicators).
+        """
+        for spec in indicators:
+            parse_indicator(spec)
+        return self._with(dataclasses.replace(self.plan, indicators=tuple(indicators), price_column=price_column))
+
+    def downcast(self) -> "Pipeline":
+        """
+        Store the processed frames with compact types (see DataProcessor.downcast).
+        """
+        return self._with(dataclasses.replace(self.plan, downcast=True))
+
+    def export(self, formats: list = ("csv",), prefix: str = "") -> "Pipeline":
+        """
+        Export every processed symbol to <prefix><symbol>.<format> (see DataOutput.save_to_multiple_formats).
+        """
+        if self.output is None:
+            raise ValueError("Exporting needs a DataOutput.")
+        return self._with(formats=tuple(formats), prefix=prefix)
+
+    def run(self, processes: int = None, max_concurrency: int = None, export_workers: int = 4) -> dict:
+        """
+        Execute the pipeline.
+
+        Args:
+            processes (int): The number of worker processes parsing and processing the payloads
+                (default: the number of CPUs; 0 processes them in a thread instead).
+            max_concurrency (int): The maximum number of concurrent API requests (see DataLoader.stream_bulk_data).
+            export_workers (int): The number of threads exporting processed symbols.
+
+        Returns:
+            dict: Per symbol, the paths of the exported files when exporting, otherwise the processed DataFrame.
+                Symbols without any bar in the date window are left out. A symbol that failed to fetch, process
+                or export maps to the exception raised instead; the other symbols are still completed.
+        """
+        if not self.symbols:
+            raise ValueError("No symbols to fetch.")
+        return asyncio.run(self._run(processes, max_concurrency, export_workers))
+
+    async def _run(self, processes: int, max_concurrency: int, export_workers: int) -> dict:
+        loop = asyncio.get_running_loop()
+        if processes == 0:
+            pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            # The fetch threads are already running when the workers start: never fork them
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+            pool = ProcessPoolExecutor(max_workers=min(processes or os.cpu_count() or 1, len(self.symbols)),
+                                       mp_context=context)
+
+        with pool, ThreadPoolExecutor(max_workers=export_workers) as exporter:
+            async def process(symbol: str, data: dict | Exception):
+                try:
+                    if isinstance(data, Exception):
+                        raise data
+                    nested_key, payload = prune_payload(data, self.plan)
+                    if payload is None:
+                        return symbol, None
+                    df = await loop.run_in_executor(pool, process_payload, nested_key, payload, self.plan)
+                    if not self.formats:
+                        return symbol, df
+                    paths = await loop.run_in_executor(exporter, self.output.save_to_multiple_formats, df,
+                                                       f"{self.prefix}{symbol}", self.formats)
+                    return symbol, paths
+                except Exception as e:
+                    logger.warning("Pipeline failed for %s: %s", symbol, e)
+                    return symbol, e
+
+            tasks = []
+            try:
+                async for symbol, data in self.loader.stream_bulk_data(list(self.symbols), self.plan.function,
+                                                                       max_concurrency, return_exceptions=True):
+                    tasks.append(asyncio.ensure_future(process(symbol, data)))
+            finally:
+                # Let the symbols already under way finish, even if the stream itself failed
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {symbol: result for symbol, result in (task.result() for task in tasks) if result is not None}
@@ -0,0 +1,142 @@
+import random
+import time
+
+import redis
+
+# Atomically refill the bucket and try to take tokens from it. Redis' own clock
+# is used so that every process sharing the bucket agrees on the current time.
+# Returns the number of milliseconds to wait before the tokens are available
+# (0 when they were taken).
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = math.ceil((requested - tokens) / rate)
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', key, math.ceil(capacity / rate) * 2)
+return wait
+"""
+
+# Empty the bucket, e.g. after the API told us we went over the limit anyway.
+_DRAIN_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('HSET', key, 'tokens', '0', 'ts', now)
+redis.call('PEXPIRE', key, math.ceil(capacity / rate) * 2)
+return 0
+"""
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter whose state lives in Redis, so the budget is shared by
+    every DataLoader instance and Celery worker that points at the same Redis and key.
+    """
+
+    def __init__(self, redis_client: redis.Redis, requests_per_minute: float = 5,
+                 burst: int = None, key: str = "alpha_vantage:rate_limit"):
+        """
+        Initialize the RateLimiter.
+
+        Args:
+            redis_client (redis.Redis): The Redis connection holding the shared bucket.
+            requests_per_minute (float): The sustained request rate allowed across all processes (default: 5).
+            burst (int): The bucket capacity, i.e. how many requests may go out back to back
+                (default: requests_per_minute, rounded down, at least 1).
+            key (str): The Redis key of the bucket (default: "alpha_vantage:rate_limit").
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive.")
+
+        self.redis = redis_client
+        self.key = key
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, int(requests_per_minute))
+        self._rate_per_ms = requests_per_minute / 60000.0
+        self._acquire_script = self.redis.register_script(_ACQUIRE_SCRIPT)
+        self._drain_script = self.redis.register_script(_DRAIN_SCRIPT)
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Try to take tokens from the bucket without blocking.
+
+        Args:
+            tokens (int): The number of tokens to take (default: 1).
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of seconds until they will be available.
+        """
+        wait_ms = self._acquire_script(keys=[self.key], args=[self._rate_per_ms, self.burst, tokens])
+        return int(wait_ms) / 1000.0
+
+    def acquire(self, tokens: int = 1, timeout: float = None) -> float:
+        """
+        Block until tokens can be taken from the bucket.
+
+        A little jitter is added to every wait so processes that were refused at the same
+        moment do not all retry at the same moment.
+
+        Args:
+            tokens (int): The number of tokens to take (default: 1).
+            timeout (float): The maximum number of seconds to wait. If not provided, waits indefinitely.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return time.monotonic() - start
+
+            wait += random.uniform(0, min(wait, 1.0) * 0.5)
+            if timeout is not None and time.monotonic() - start + wait > timeout:
+                raise TimeoutError(f"Rate limiter did not grant {tokens} token(s) within {timeout} seconds.")
+            time.sleep(wait)
+
+    def drain(self):
+        """
+        Empty the bucket so every process sharing it slows down until it refills.
+        """
+        self._drain_script(keys=[self.key], args=[self._rate_per_ms, self.burst])
+
+    @staticmethod
+    def backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+        """
+        Compute an exponential backoff delay with full jitter.
+
+        Args:
+            attempt (int): The retry attempt, starting at 0.
+            base (float): The delay of the first attempt in seconds (default: 1.0).
+            cap (float): The maximum delay in seconds (default: 60.0).
+
+        Returns:
+            float: The number of seconds to sleep.
+        """
+        return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,150 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+import redis
+
+from .cache_keys import NAMESPACE, KEY_VERSION, normalize_symbol
+
+# Celery queues, from the most to the least urgent. Run a dedicated worker for HOT_QUEUE so quotes
+# and watchlist tickers never wait behind a long fundamentals refresh.
+HOT_QUEUE = "mf.hot"
+TIME_SERIES_QUEUE = "mf.timeseries"
+FUNDAMENTALS_QUEUE = "mf.fundamentals"
+QUEUES = (HOT_QUEUE, TIME_SERIES_QUEUE, FUNDAMENTALS_QUEUE)
+
+FUNDAMENTAL_FUNCTIONS = ("OVERVIEW", "INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW", "EARNINGS")
+
+# Task priorities (0 is the most urgent, as with Celery's Redis transport)
+HOT_PRIORITY = 0
+DEFAULT_PRIORITY = 5
+
+DEFAULT_CHUNK_SIZE = 25
+
+
+@dataclass
+class RefreshChunk:
+    """
+    A batch of symbols refreshed by a single task.
+    """
+    function: str
+    symbols: list
+    queue: str
+    priority: int
+
+
+def request_params(function: str, symbol: str = None) -> dict:
+    """
+    Build the request parameters DataLoader uses for a function and symbol, so refreshed entries land
+    under the cache keys the getters read.
+    """
+    params = {"function": function}
+    if symbol is not None:
+        params["symbol"] = normalize_symbol(symbol)
+    if function.startswith("TIME_SERIES"):
+        params["outputsize"] = "full"
+    return params
+
+
+def new_job_id(function: str) -> str:
+    """
+    Build the identifier of a new refresh run, unique even for several runs of a function on the same day.
+    """
+    return f"{function}:{datetime.now():%Y-%m-%dT%H:%M:%S}:{uuid.uuid4().hex[:8]}"
+
+
+def function_queue(function: str) -> str:
+    """
+    Get the queue refreshes of a function are sent to.
+    """
+    if function == "GLOBAL_QUOTE":
+        return HOT_QUEUE
+    if function in FUNDAMENTAL_FUNCTIONS:
+        return FUNDAMENTALS_QUEUE
+    return TIME_SERIES_QUEUE
+
+
+def plan_refresh(symbols: list, function: str, watchlist: list = (), chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+    """
+    Split a universe of symbols into chunks, watchlist symbols first.
+
+    Args:
+        symbols (list): The symbols to refresh.
+        function (str): The Alpha Vantage function to refresh.
+        watchlist (list): Symbols to refresh ahead of the others, on the hot queue.
+        chunk_size (int): The number of symbols per chunk.
+
+    Returns:
+        list: The RefreshChunks, in the order they should be queued.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    symbols = list(dict.fromkeys(normalize_symbol(symbol) for symbol in symbols))
+    hot = {normalize_symbol(symbol) for symbol in watchlist}
+    queue = function_queue(function)
+
+    chunks = []
+    for group, group_queue, priority in [([s for s in symbols if s in hot], HOT_QUEUE, HOT_PRIORITY),
+                                         ([s for s in symbols if s not in hot], queue,
+                                          HOT_PRIORITY if queue == HOT_QUEUE else DEFAULT_PRIORITY)]:
+        for start in range(0, len(group), chunk_size):
+            chunks.append(RefreshChunk(function, group[start:start + chunk_size], group_queue, priority))
+    return chunks
+
+
+class RefreshProgress:
+    """
+    Progress of a refresh job kept in Redis (the set of refreshed symbols), so a chunk redelivered
+    after a worker restart only fetches what is still missing.
+    """
+
+    TTL = 2 * 24 * 60 * 60
+
+    def __init__(self, redis_client: redis.Redis, job_id: str):
+        """
+        Initialize the RefreshProgress.
+
+        Args:
+            redis_client (redis.Redis): The Redis connection shared by the workers.
+            job_id (str): The job identifier, e.g. "TIME_SERIES_DAILY:2024-01-02T06:00:00:3f2a9c1e".
+        """
+        self.redis = redis_client
+        self.job_id = job_id
+        self._prefix = f"{NAMESPACE}:v{KEY_VERSION}:refresh:{job_id}"
+
+    def start(self, total: int):
+        """
+        Record the number of symbols of the job and forget the symbols refreshed by an earlier run.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(f"{self._prefix}:total", total, ex=self.TTL)
+        pipe.delete(f"{self._prefix}:done")
+        pipe.execute()
+
+    def pending(self, symbols: list) -> list:
+        """
+        Get the symbols that have not been refreshed yet, in order.
+        """
+        if not symbols:
+            return []
+        done = self.redis.smismember(f"{self._prefix}:done", symbols)
+        return [symbol for symbol, is_done in zip(symbols, done) if not is_done]
+
+    def mark_done(self, symbols: list):
+        """
+        Record symbols as refreshed.
+        """
+        if not symbols:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sadd(f"{self._prefix}:done", *symbols)
+        pipe.expire(f"{self._prefix}:done", self.TTL)
+        pipe.execute()
+
+    def status(self) -> dict:
+        """
+        Get the number of refreshed symbols and the size of the job.
+        """
+        total, done = self.redis.get(f"{self._prefix}:total"), self.redis.scard(f"{self._prefix}:done")
+        return {"job_id": self.job_id, "done": done, "total": int(total) if total is not None else None}
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extend the lock only if we still own it
+_EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Request coalescing for cache misses: of all the callers missing the same cache key at the same
+    time, only one fetches and the others wait for its result.
+
+    Callers in the same process share an in-process future. Callers in other processes (Celery
+    workers, API servers) are coordinated with a short-lived Redis lock: whoever does not get the
+    lock polls the cache until the lock holder has stored the result. The lock holder keeps extending
+    the lock while it fetches (however long the rate limiter and retries make it wait), so the lock only
+    expires when its holder died.
+    """
+
+    def __init__(self, redis_client: redis.Redis, lock_ttl: float = 60, poll_interval: float = 0.1,
+                 wait_timeout: float = 120):
+        """
+        Initialize the SingleFlight guard.
+
+        Args:
+            redis_client (redis.Redis): The Redis connection holding the locks.
+            lock_ttl (float): Seconds after which a lock expires if its holder died (default: 60); the holder
+                extends it every lock_ttl / 3 seconds.
+            poll_interval (float): Seconds between cache checks while another process fetches (default: 0.1).
+            wait_timeout (float): Seconds to wait for another process before fetching anyway (default: 120).
+        """
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self._release_script = self.redis.register_script(_RELEASE_SCRIPT)
+        self._extend_script = self.redis.register_script(_EXTEND_SCRIPT)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key: str, fetch, load):
+        """
+        Get the value of key, fetching it at most once across concurrent callers.
+
+        Args:
+            key (str): The cache key being fetched.
+            fetch (callable): Fetches the value and stores it in the cache.
+            load (callable): Reads the value from the cache, returning None on a miss.
+
+        Returns:
+            The value returned by fetch, or loaded from the cache after another caller fetched it.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(self._do_across_processes(key, fetch, load))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return future.result()
+
+    def _do_across_processes(self, key: str, fetch, load):
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+
+        while time.monotonic() < deadline:
+            if self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+                released = threading.Event()
+                keeper = threading.Thread(target=self._keep_lock, args=(lock_key, token, released), daemon=True)
+                keeper.start()
+                try:
+                    # The previous lock holder may have stored the value just before we got the lock
+                    value = load()
+                    return value if value is not None else fetch()
+                finally:
+                    released.set()
+                    keeper.join()
+                    self._release_script(keys=[lock_key], args=[token])
+
+            time.sleep(self.poll_interval)
+            value = load()
+            if value is not None:
+                return value
+
+        logger.warning("Timed out waiting for another process to fetch %s, fetching anyway...", key)
+        return fetch()
+
+    def _keep_lock(self, lock_key: str, token: str, released: threading.Event):
+        """
+        Private method to extend a lock we hold until released is set, or until we lost the lock.
+        """
+        while not released.wait(self.lock_ttl / 3):
+            try:
+                if not self._extend_script(keys=[lock_key], args=[token, int(self.lock_ttl * 1000)]):
+                    return
+            except redis.RedisError as e:
+                logger.warning("Could not extend the lock %s: %s", lock_key, e)
@@ -0,0 +1,53 @@
+"""
+Compare DataOutput.save_to_excel in constant-memory mode with the default df.to_excel engine.
+
+Run from the repository root:
+    python -m backend.tests.benchmarks.bench_excel [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.src.data_output import DataOutput
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(0.01 * rng.standard_normal(rows).cumsum())
+    return pd.DataFrame({
+        "Open": close * 0.99,
+        "High": close * 1.01,
+        "Low": close * 0.98,
+        "Close": close,
+        "Volume": rng.integers(1000, 100000, rows),
+        "Daily Return": np.concatenate([[np.nan], np.diff(close) / close[:-1]])
+    }, index=pd.date_range("1900-01-01", periods=rows, freq="D"))
+
+
+def bench(label: str, func):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    print(f"{label:<30} {seconds:8.1f} s")
+    return seconds
+
+
+def main(rows: int):
+    df = make_frame(rows)
+    print(f"{rows} rows x {len(df.columns)} columns")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output = DataOutput(output_dir=output_dir)
+        default = bench("df.to_excel (default engine)", lambda: output.save_to_excel(df, "default.xlsx", constant_memory=False))
+        fast = bench("constant_memory", lambda: output.save_to_excel(df, "constant_memory.xlsx"))
+        print(f"{'speedup':<30} {default / fast:8.1f}x")
+        print(f"sizes: {os.path.getsize(os.path.join(output_dir, 'default.xlsx')) / 2 ** 20:.1f} MiB vs "
+              f"{os.path.getsize(os.path.join(output_dir, 'constant_memory.xlsx')) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
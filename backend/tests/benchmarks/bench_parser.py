@@ -0,0 +1,43 @@
+"""
+Compare DataProcessor.parse_time_series / parse_reports with the generic json_to_dataframe path.
+
+Run from the repository root:
+    python -m backend.tests.benchmarks.bench_parser
+"""
+import timeit
+
+from backend.src.data_processor import DataProcessor
+from backend.tests.payloads import make_daily_payload, make_income_statement_payload
+
+
+def bench(label: str, func, number: int) -> float:
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"{label:<45} {seconds * 1000:9.2f} ms")
+    return seconds
+
+
+def main():
+    processor = DataProcessor()
+
+    # 20+ years of daily bars
+    daily = make_daily_payload(days=252 * 22)
+    print(f"TIME_SERIES_DAILY, {len(daily['Time Series (Daily)'])} rows")
+    generic = bench("json_to_dataframe", lambda: processor.json_to_dataframe(daily, "Time Series (Daily)"), 10)
+    fast = bench("parse_time_series", lambda: processor.parse_time_series(daily, "Time Series (Daily)"), 10)
+    print(f"{'speedup':<45} {generic / fast:9.1f}x\n")
+
+    income = make_income_statement_payload(quarters=80)
+    print(f"INCOME_STATEMENT, {len(income['quarterlyReports'])} quarterly reports")
+    generic = bench("json_to_dataframe (keyed by fiscalDateEnding)",
+                    lambda: reports_to_dataframe(processor, income["quarterlyReports"]), 50)
+    fast = bench("parse_reports", lambda: processor.parse_reports(income, "quarterlyReports"), 50)
+    print(f"{'speedup':<45} {generic / fast:9.1f}x")
+
+
+def reports_to_dataframe(processor: DataProcessor, reports: list):
+    # The generic path needs the reports keyed by date first
+    return processor.json_to_dataframe({report["fiscalDateEnding"]: report for report in reports})
+
+
+if __name__ == "__main__":
+    main()
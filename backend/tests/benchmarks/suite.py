@@ -0,0 +1,171 @@
+"""
+Offline end-to-end benchmark: fetch, cache, parse, process and export the daily series of a synthetic
+universe of tickers, and fetch and index its fundamentals (GLOBAL_QUOTE, OVERVIEW, INCOME_STATEMENT),
+against the local Alpha Vantage stub (replaying tests/fixtures) and an in-memory Redis (fakeredis).
+
+Run from the repository root:
+    python -m backend.tests.benchmarks.suite --sizes 10,100,1000,5000
+    python -m backend.tests.benchmarks.suite --sizes 10,100 --update-baseline
+    MF_BENCHMARK=1 python -m pytest backend/tests/benchmarks
+
+Timings are compared per symbol with baseline.json; a stage more than --tolerance times slower than
+its baseline (and slower by more than the noise floor) is a regression and makes the run fail.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+import fakeredis
+
+from backend.src.data_loader import DataLoader
+from backend.src.data_output import DataOutput
+from backend.src.data_processor import DataProcessor
+from backend.src.fundamentals import FundamentalsIndex
+from backend.tests.stub_server import AlphaVantageStub, FixturePayloads
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+STAGES = ("fetch", "cache", "parse", "process", "export", "fundamentals")
+FUNDAMENTALS = ("GLOBAL_QUOTE", "OVERVIEW", "INCOME_STATEMENT")
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+# Differences below this many seconds per stage are noise, whatever the ratio
+NOISE_FLOOR = 0.05
+
+
+def run_universe(size: int, days: int = 250, output_dir: str = None) -> dict:
+    """
+    Run every stage once over a universe of size tickers.
+
+    Returns:
+        dict: The wall-clock seconds of each stage.
+    """
+    symbols = [f"T{i:05d}" for i in range(size)]
+    processor = DataProcessor()
+    timings = {}
+
+    with AlphaVantageStub(FixturePayloads(days=days)) as stub, tempfile.TemporaryDirectory() as tmp_dir:
+        loader = DataLoader(api_key="benchmark", redis_client=fakeredis.FakeRedis(), requests_per_minute=10 ** 9,
+                            base_url=stub.url)
+        output = DataOutput(output_dir=output_dir or tmp_dir)
+
+        gc.collect()
+        start = time.perf_counter()
+        asyncio.run(loader.get_bulk_data_async(symbols, "TIME_SERIES_DAILY"))
+        timings["fetch"] = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        payloads = loader.get_bulk_data(symbols, "TIME_SERIES_DAILY")
+        timings["cache"] = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        frames = {symbol: processor.clean_stock_data(processor.parse_time_series(payload))
+                  for symbol, payload in payloads.items()}
+        timings["parse"] = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        panel = processor.calculate_panel_metrics(processor.build_panel(frames))
+        timings["process"] = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        long = panel.stack(level=1, future_stack=True).reset_index(level=1)
+        output.save_to_multiple_formats(long, f"universe_{size}", formats=("csv", "parquet"))
+        timings["export"] = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        fundamentals = loader.get_many([{"function": function, "symbol": symbol}
+                                        for function in FUNDAMENTALS for symbol in symbols])
+        index = FundamentalsIndex(loader)
+        index.update_many(dict(zip(symbols, fundamentals[size:2 * size])), dict(zip(symbols, fundamentals[2 * size:])))
+        index.screen(["PERatio < 30", "RevenueGrowthYOY > -1"], sort_by="MarketCapitalization")
+        timings["fundamentals"] = time.perf_counter() - start
+
+        loader.close()
+
+    return timings
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare results with the baseline.
+
+    Args:
+        results (dict): Stage timings per universe size, as returned by run_suite.
+        baseline (dict): Seconds per symbol of each stage per universe size.
+        tolerance (float): How many times slower than the baseline a stage may be.
+
+    Returns:
+        list: A message per regression.
+    """
+    regressions = []
+    for size, timings in results.items():
+        for stage, seconds in timings.items():
+            expected = baseline.get(str(size), {}).get(stage)
+            if expected is None:
+                continue
+            expected *= size
+            if seconds > expected * tolerance and seconds - expected > NOISE_FLOOR:
+                regressions.append(f"{size} tickers, {stage}: {seconds:.3f} s vs baseline {expected:.3f} s")
+    return regressions
+
+
+def run_suite(sizes: tuple = DEFAULT_SIZES, days: int = 250) -> dict:
+    """
+    Run every stage over universes of each size.
+
+    Returns:
+        dict: The stage timings per universe size.
+    """
+    results = {}
+    for size in sizes:
+        results[size] = run_universe(size, days)
+        print(f"{size:>6} tickers  " + "  ".join(f"{stage} {results[size][stage]:7.3f} s" for stage in STAGES))
+    return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH):
+    baseline = load_baseline(path)
+    for size, timings in results.items():
+        baseline[str(size)] = {stage: seconds / size for stage, seconds in timings.items()}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated universe sizes")
+    parser.add_argument("--days", type=int, default=250, help="daily bars per ticker")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor")
+    parser.add_argument("--update-baseline", action="store_true", help="store these timings as the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suite(tuple(int(size) for size in args.sizes.split(",")), args.days)
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, load_baseline(), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+from backend.tests.benchmarks.suite import compare, load_baseline, run_suite
+
+# Wall-clock timings depend on the machine, so the benchmark only runs when asked for
+pytestmark = pytest.mark.skipif(not os.getenv("MF_BENCHMARK"), reason="set MF_BENCHMARK=1 to run the benchmarks")
+
+
+def test_small_universes_do_not_regress():
+    # Generous tolerance: the baseline was recorded on another machine
+    results = run_suite(sizes=(10, 100))
+
+    assert compare(results, load_baseline(), tolerance=3.0) == []
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+def make_daily_payload(days: int = 60, seed: int = 0, start: str = "2024-01-01") -> dict:
+    """Build a TIME_SERIES_DAILY style payload, newest date first like the API."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=days)
+    closes = 100 * np.exp(0.01 * rng.standard_normal(days).cumsum())
+    series = {
+        date.strftime("%Y-%m-%d"): {
+            "1. open": f"{close - 0.5:.4f}",
+            "2. high": f"{close + 1:.4f}",
+            "3. low": f"{close - 1:.4f}",
+            "4. close": f"{close:.4f}",
+            "5. volume": str(int(rng.integers(1000, 100000)))
+        }
+        for date, close in zip(dates, closes)
+    }
+    return {"Meta Data": {}, "Time Series (Daily)": dict(reversed(list(series.items())))}
+
+
+def make_income_statement_payload(quarters: int = 12, seed: int = 0, symbol: str = "TEST") -> dict:
+    """Build an INCOME_STATEMENT style payload, newest report first like the API."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end="2024-12-31", periods=quarters, freq="QE")[::-1]
+    revenue = 1e9 * (1 + rng.random(quarters))
+
+    def report(date, revenue, net_income):
+        return {
+            "fiscalDateEnding": date.strftime("%Y-%m-%d"),
+            "reportedCurrency": "USD",
+            "totalRevenue": str(int(revenue)),
+            "grossProfit": str(int(revenue * 0.4)),
+            "operatingIncome": str(int(revenue * 0.2)),
+            "netIncome": net_income
+        }
+
+    quarterly = [report(date, rev, str(int(rev * 0.1)) if i else "None") for i, (date, rev) in enumerate(zip(dates, revenue))]
+    annual = [report(date, rev * 4, str(int(rev * 0.4))) for date, rev in zip(dates[::4], revenue[::4])]
+    return {"symbol": symbol, "annualReports": annual, "quarterlyReports": quarterly}
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from backend.src.api import ApiServer
+from backend.src.data_loader import DataLoader
+from backend.tests.payloads import make_daily_payload
+from backend.tests.stub_server import FakeResponse
+
+
+@pytest.fixture
+def api_calls():
+    return []
+
+
+@pytest.fixture
+def server(api_calls, monkeypatch):
+    loader = DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis(), requests_per_minute=6000)
+
+    def fake_get(url, params=None, **kwargs):
+        api_calls.append(dict(params))
+        if params["symbol"] == "BAD":
+            return FakeResponse({"Error Message": "Invalid API call."})
+        if params["function"] == "GLOBAL_QUOTE":
+            return FakeResponse({"Global Quote": {"01. symbol": params["symbol"], "05. price": "100.0000"}})
+        return FakeResponse(make_daily_payload(days=300))
+
+    monkeypatch.setattr(loader.session, "get", fake_get)
+    return ApiServer(loader)
+
+
+def request(server: ApiServer, *requests) -> list:
+    """Send GET requests (path, headers) to the app in order and return (status, headers, body) triples."""
+    async def run():
+        async with TestClient(TestServer(server.create_app())) as client:
+            results = []
+            for path, headers in requests:
+                response = await client.get(path, headers=headers)
+                results.append((response.status, response.headers, await response.read()))
+            return results
+
+    return asyncio.run(run())
+
+
+def test_quotes_are_batched_and_cached(server, api_calls):
+    (status, _, body), (_, _, again) = request(server, ("/api/quotes?symbols=msft,AAPL", {}),
+                                               ("/api/quotes?symbols=AAPL,MSFT", {}))
+
+    assert status == 200
+    assert body == again == b'{"AAPL":{"symbol":"AAPL","price":"100.0000"},"MSFT":{"symbol":"MSFT","price":"100.0000"}}'
+    assert sorted(call["symbol"] for call in api_calls) == ["AAPL", "MSFT"]
+
+
+def test_etag_and_gzip(server):
+    (_, headers, _), = request(server, ("/api/series?symbols=AAPL&columns=Close,Moving%20Average", {}))
+    (status, _, body), (_, gzip_headers, _) = request(
+        server,
+        ("/api/series?symbols=AAPL&columns=Close,Moving%20Average", {"If-None-Match": headers["ETag"]}),
+        ("/api/series?symbols=AAPL&columns=Close,Moving%20Average", {"Accept-Encoding": "gzip"}),
+    )
+
+    assert status == 304 and body == b""
+    assert gzip_headers["Content-Encoding"] == "gzip"
+    assert gzip_headers["ETag"] == headers["ETag"]
+
+
+def test_series_are_processed_per_symbol(server):
+    (status, _, body), = request(server, ("/api/series?symbols=AAPL,IBM&start=2024-01-01&columns=Close,Moving%20Average", {}))
+
+    result = json.loads(body)
+    assert status == 200
+    assert set(result) == {"AAPL", "IBM"}
+    assert set(result["AAPL"]) == {"dates", "Close", "Moving Average"}
+    assert min(result["AAPL"]["dates"]) >= "2024-01-01"
+    assert len(result["AAPL"]["dates"]) == len(result["AAPL"]["Close"])
+
+
+def test_symbols_without_a_series_do_not_fail_the_batch(server):
+    (status, _, body), = request(server, ("/api/series?symbols=AAPL,BAD&columns=Close", {}))
+
+    result = json.loads(body)
+    assert status == 200
+    assert result["BAD"] == {"error": "Invalid API call."}
+    assert set(result["AAPL"]) == {"dates", "Close"}
+
+
+def test_bad_requests(server):
+    responses = request(server, ("/api/quotes", {}), ("/api/series?symbols=AAPL&columns=Nope", {}),
+                        ("/api/series?symbols=AAPL&function=OVERVIEW", {}), ("/api/series?symbols=AAPL&points=many", {}),
+                        ("/api/series?symbols=AAPL&start=someday", {}), ("/api/series?symbols=AAPL&method=bars", {}))
+    assert [status for status, _, _ in responses] == [400] * 6
+
+
+def test_internal_errors_are_not_client_errors(server, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("Column names overlap between frames")
+
+    monkeypatch.setattr(server.processor, "calculate_moving_average", broken)
+
+    (status, headers, body), (not_found, _, _) = request(server, ("/api/series?symbols=AAPL", {}),
+                                                         ("/api/nothing", {}))
+
+    assert status == 500 and json.loads(body) == {"error": "Internal server error"}
+    assert headers["Access-Control-Allow-Origin"] == "*"
+    assert not_found == 404
+
+
+def test_series_are_downsampled(server):
+    (status, _, body), = request(server, ("/api/series?symbols=AAPL&points=50&method=ohlc", {}))
+
+    assert status == 200
+    assert len(json.loads(body)["AAPL"]["dates"]) == 50
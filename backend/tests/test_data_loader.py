@@ -0,0 +1,370 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+import pytest
+
+from backend.src.data_loader import DataLoader
+from backend.src.rate_limiter import RateLimiter
+from backend.tests.stub_server import AlphaVantageStub, FakeResponse
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def loader(redis_client):
+    return DataLoader(api_key="demo", redis_client=redis_client, requests_per_minute=6000)
+
+
+@pytest.fixture
+def api_calls(loader, monkeypatch):
+    """Replace the HTTP call with a canned response and record every request."""
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(dict(params))
+        return FakeResponse({"Global Quote": {"01. symbol": params.get("symbol")}})
+
+    monkeypatch.setattr(loader.session, "get", fake_get)
+    return calls
+
+
+def test_rate_limiter_grants_burst_then_waits(redis_client):
+    limiter = RateLimiter(redis_client, requests_per_minute=60, burst=2)
+
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert 0 < limiter.try_acquire() <= 1.0
+
+
+def test_rate_limiter_is_shared_between_instances(redis_client):
+    first = RateLimiter(redis_client, requests_per_minute=60, burst=1)
+    second = RateLimiter(redis_client, requests_per_minute=60, burst=1)
+
+    assert first.try_acquire() == 0
+    assert second.try_acquire() > 0
+
+
+def test_rate_limiter_drain_empties_bucket(redis_client):
+    limiter = RateLimiter(redis_client, requests_per_minute=60, burst=5)
+    limiter.drain()
+
+    assert limiter.try_acquire() > 0
+
+
+def test_cache_hits_do_not_spend_rate_budget(loader, redis_client, api_calls):
+    for symbol in ["AAPL", "MSFT"]:
+        params = {"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": "full"}
+        redis_client.set(loader._generate_cache_key(params), json.dumps({"symbol": symbol}))
+    loader.rate_limiter = RateLimiter(redis_client, requests_per_minute=1, burst=1, key="test:bucket")
+
+    start = time.monotonic()
+    results = loader.get_bulk_data(["AAPL", "MSFT"], function="TIME_SERIES_DAILY")
+
+    assert time.monotonic() - start < 1
+    assert results["AAPL"] == {"symbol": "AAPL"}
+    assert api_calls == []
+    assert loader.rate_limiter.try_acquire() == 0
+
+
+def test_rate_limit_note_backs_off_and_retries(loader, monkeypatch):
+    responses = [FakeResponse({"Note": "Thank you for using Alpha Vantage!"}), FakeResponse({"ok": True})]
+    monkeypatch.setattr(loader.session, "get", lambda url, params=None, **kwargs: responses.pop(0))
+    monkeypatch.setattr(RateLimiter, "backoff", staticmethod(lambda attempt, base=1.0, cap=60.0: 0))
+
+    assert loader.get_stock_price("AAPL") == {"ok": True}
+    assert responses == []
+
+
+def test_bulk_data_async_fetches_misses_concurrently(redis_client):
+    symbols = [f"SYM{i}" for i in range(20)]
+
+    with AlphaVantageStub(latency=0.2) as stub:
+        loader = DataLoader(api_key="demo", redis_client=redis_client, requests_per_minute=6000, base_url=stub.url)
+
+        start = time.monotonic()
+        results = asyncio.run(loader.get_bulk_data_async(symbols, function="TIME_SERIES_DAILY", max_concurrency=10))
+        elapsed = time.monotonic() - start
+
+    assert sorted(results) == sorted(symbols)
+    assert results["SYM0"]["Meta Data"]["2. Symbol"] == "SYM0"
+    assert len(stub.requests) == len(symbols)
+    # 20 requests of 200 ms each take 4 s one at a time
+    assert elapsed < 2.0
+
+
+def test_stream_bulk_data_yields_cache_hits_first(loader, redis_client):
+    params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL", "outputsize": "full"}
+    redis_client.set(loader._generate_cache_key(params), json.dumps({"cached": True}))
+
+    async def collect():
+        return [symbol async for symbol, data in loader.stream_bulk_data(["MSFT", "AAPL"], "TIME_SERIES_DAILY")]
+
+    with AlphaVantageStub() as stub:
+        loader.base_url = stub.url
+        order = asyncio.run(collect())
+
+    assert order == ["AAPL", "MSFT"]
+    assert [request["symbol"] for request in stub.requests] == ["MSFT"]
+
+
+def test_stream_bulk_data_stops_without_waiting_for_queued_fetches(loader, monkeypatch):
+    requested = []
+
+    def fake_get(url, params=None, **kwargs):
+        requested.append(params["symbol"])
+        if params["symbol"] == "FAIL":
+            return FakeResponse({}, status_code=500)
+        time.sleep(0.5)
+        return FakeResponse({"symbol": params["symbol"]})
+
+    monkeypatch.setattr(loader.session, "get", fake_get)
+    symbols = ["FAIL", "SLOW1", "SLOW2", "SLOW3", "SLOW4"]
+
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        asyncio.run(loader.get_bulk_data_async(symbols, "TIME_SERIES_DAILY", max_concurrency=2))
+
+    assert time.monotonic() - start < 0.4
+    time.sleep(0.6)
+    # Only the fetch already under way next to the failed one was sent
+    assert requested == ["FAIL", "SLOW1"]
+
+
+def test_bulk_data_async_passes_outputsize_and_return_exceptions(loader, monkeypatch):
+    requested = []
+
+    def fake_get(url, params=None, **kwargs):
+        requested.append(params["outputsize"])
+        return FakeResponse({}, status_code=500 if params["symbol"] == "FAIL" else 200)
+
+    monkeypatch.setattr(loader.session, "get", fake_get)
+
+    results = asyncio.run(loader.get_bulk_data_async(["AAPL", "FAIL"], "TIME_SERIES_DAILY", return_exceptions=True,
+                                                     outputsize="compact"))
+
+    assert results["AAPL"] == {} and isinstance(results["FAIL"], ConnectionError)
+    assert requested == ["compact", "compact"]
+
+
+def test_bulk_data_uses_one_round_trip_for_cache_reads_and_writes(loader, redis_client, api_calls, monkeypatch):
+    params = {"function": "GLOBAL_QUOTE", "symbol": "AAPL", "outputsize": "full"}
+    redis_client.set(loader._generate_cache_key(params), json.dumps({"cached": True}))
+
+    round_trips = []
+    monkeypatch.setattr(redis_client, "get", lambda *args: round_trips.append("get"))
+    monkeypatch.setattr(redis_client, "setex", lambda *args: round_trips.append("setex"))
+    original_mget = redis_client.mget
+    monkeypatch.setattr(redis_client, "mget", lambda *args: round_trips.append("mget") or original_mget(*args))
+
+    results = loader.get_bulk_data(["AAPL", "MSFT", "GOOG"], function="GLOBAL_QUOTE")
+
+    assert list(results) == ["AAPL", "MSFT", "GOOG"]
+    assert results["AAPL"] == {"cached": True}
+    assert [call["symbol"] for call in api_calls] == ["MSFT", "GOOG"]
+    assert round_trips == ["mget"]
+    assert loader.cache_get_many([{**params, "symbol": "GOOG"}]) == [{"Global Quote": {"01. symbol": "GOOG"}}]
+
+
+@pytest.mark.parametrize("codec", ["json", "zlib", "zstd"])
+def test_cache_codecs_round_trip(redis_client, codec):
+    loader = DataLoader(api_key="demo", redis_client=redis_client, cache_codec=codec)
+    params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL", "outputsize": "full"}
+    data = {"Time Series (Daily)": {f"2024-01-{day:02d}": {"4. close": "100.0"} for day in range(1, 29)}}
+
+    loader.cache_set_many([(params, data)])
+
+    assert redis_client.get(loader._generate_cache_key(params)).startswith(b"MF")
+    assert loader.cache_get_many([params]) == [data]
+    if codec != "json":
+        assert len(redis_client.get(loader._generate_cache_key(params))) < len(json.dumps(data))
+
+
+def test_legacy_json_cache_entries_are_still_readable(loader, redis_client):
+    params = {"function": "OVERVIEW", "symbol": "AAPL"}
+    redis_client.set(loader._generate_cache_key(params), json.dumps({"Symbol": "AAPL"}))
+
+    assert loader.get_company_overview("AAPL") == {"Symbol": "AAPL"}
+
+
+def test_cache_policy_sets_expiry_per_function(loader, redis_client):
+    quote = {"function": "GLOBAL_QUOTE", "symbol": "AAPL"}
+    overview = {"function": "OVERVIEW", "symbol": "AAPL"}
+
+    loader.cache_set_many([(quote, {}), (overview, {})])
+
+    assert redis_client.ttl(loader._generate_cache_key(quote)) <= loader.cache_policy.expiry("GLOBAL_QUOTE")
+    assert redis_client.ttl(loader._generate_cache_key(overview)) > loader.cache_policy.expiry("GLOBAL_QUOTE")
+
+
+def test_stale_entries_are_refetched_without_revalidation(loader, redis_client, api_calls):
+    params = {"function": "GLOBAL_QUOTE", "symbol": "AAPL"}
+    redis_client.set(loader._generate_cache_key(params), loader.cache_codec.encode({"stale": True}, stored_at=0))
+
+    assert loader.get_stock_price("AAPL") == {"Global Quote": {"01. symbol": "AAPL"}}
+    assert len(api_calls) == 1
+
+
+def test_stale_while_revalidate_serves_stale_and_queues_one_refresh(loader, redis_client, api_calls):
+    queued = []
+    loader.revalidate = queued.append
+    params = {"function": "GLOBAL_QUOTE", "symbol": "AAPL"}
+    redis_client.set(loader._generate_cache_key(params), loader.cache_codec.encode({"stale": True}, stored_at=0))
+
+    assert loader.get_stock_price("AAPL") == {"stale": True}
+    assert loader.get_stock_price("AAPL") == {"stale": True}
+    assert queued == [params]
+    assert api_calls == []
+
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_concurrent_misses_on_same_key_fetch_once(redis_client, processes):
+    # Separate loaders stand in for separate processes: they only share Redis
+    loaders = [DataLoader(api_key="demo", redis_client=redis_client, requests_per_minute=6000)
+               for _ in range(processes)]
+    calls = []
+
+    def slow_get(url, params=None, **kwargs):
+        calls.append(params["symbol"])
+        time.sleep(0.2)
+        return FakeResponse({"Global Quote": {"01. symbol": params["symbol"]}})
+
+    for loader in loaders:
+        loader.session.get = slow_get
+        loader.single_flight.poll_interval = 0.01
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda i: loaders[i % processes].get_stock_price("AAPL"), range(6)))
+
+    assert calls == ["AAPL"]
+    assert all(result == {"Global Quote": {"01. symbol": "AAPL"}} for result in results)
+
+
+def test_slow_fetch_keeps_its_lock_past_the_lock_ttl(redis_client):
+    loaders = [DataLoader(api_key="demo", redis_client=redis_client, requests_per_minute=6000) for _ in range(2)]
+    calls = []
+
+    def slow_get(url, params=None, **kwargs):
+        calls.append(params["symbol"])
+        time.sleep(0.5)
+        return FakeResponse({"Global Quote": {"01. symbol": params["symbol"]}})
+
+    for loader in loaders:
+        loader.session.get = slow_get
+        loader.single_flight.lock_ttl = 0.15
+        loader.single_flight.poll_interval = 0.01
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(loaders[0].get_stock_price, "AAPL")
+        time.sleep(0.05)
+        second = executor.submit(loaders[1].get_stock_price, "AAPL")
+        assert first.result() == second.result()
+
+    assert calls == ["AAPL"]
+    assert redis_client.keys("*:lock") == []
+
+
+def test_local_cache_serves_repeated_reads_without_redis(redis_client, monkeypatch):
+    loader = DataLoader(api_key="demo", redis_client=redis_client, local_cache_size=10)
+    params = {"function": "OVERVIEW", "symbol": "AAPL"}
+    loader.cache_set_many([(params, {"Symbol": "AAPL"})])
+
+    monkeypatch.setattr(redis_client, "mget", lambda *args: pytest.fail("Redis was queried"))
+    assert loader.get_company_overview("AAPL") == {"Symbol": "AAPL"}
+    assert loader.local_cache.stats()["hits"] == 1
+    loader.close()
+
+
+def test_local_cache_is_invalidated_by_other_writers(redis_client):
+    reader = DataLoader(api_key="demo", redis_client=redis_client, local_cache_size=10)
+    writer = DataLoader(api_key="demo", redis_client=redis_client)
+    params = {"function": "OVERVIEW", "symbol": "AAPL"}
+    writer.cache_set_many([(params, {"version": 1})])
+    assert reader.get_company_overview("AAPL") == {"version": 1}
+
+    writer.cache_set_many([(params, {"version": 2})])
+
+    deadline = time.monotonic() + 5
+    while len(reader.local_cache) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reader.get_company_overview("AAPL") == {"version": 2}
+    reader.close()
+
+
+def test_cache_keys_are_canonical_and_namespaced(loader):
+    key = loader._generate_cache_key({"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+
+    assert key.startswith("mf:v1:GLOBAL_QUOTE:AAPL:")
+    assert loader._generate_cache_key({"function": "GLOBAL_QUOTE", "symbol": " aapl"}) == key
+    assert loader._generate_cache_key({"symbol": "AAPL", "function": "GLOBAL_QUOTE", "apikey": "other"}) == key
+    assert loader._generate_cache_key({"function": "GLOBAL_QUOTE", "symbol": "AAPL", "datatype": "csv"}) != key
+    assert loader._generate_cache_key({"function": "SECTOR"}).startswith("mf:v1:SECTOR:-:")
+
+
+def test_invalidate_deletes_entries_by_function_or_symbol(loader, redis_client, api_calls):
+    loader.cache_set_many([({"function": function, "symbol": symbol}, {"cached": True})
+                           for function in ("OVERVIEW", "GLOBAL_QUOTE") for symbol in ("AAPL", "MSFT")])
+
+    assert loader.invalidate(symbol="aapl") == 2
+    assert loader.invalidate(function="OVERVIEW") == 1
+    assert len(redis_client.keys("mf:v1:*")) == 1
+
+    loader.get_stock_price("MSFT")
+    loader.get_company_overview("MSFT")
+    assert [call["function"] for call in api_calls] == ["OVERVIEW"]
+
+    with pytest.raises(ValueError):
+        loader.invalidate()
+
+
+def test_invalidate_keeps_locks_of_fetches_in_flight(loader, redis_client, api_calls):
+    params = {"function": "OVERVIEW", "symbol": "AAPL"}
+    key = loader._generate_cache_key(params)
+    loader.cache_set_many([(params, {"cached": True})])
+    redis_client.set(f"{key}:lock", "holder")
+    redis_client.set(f"{key}:revalidating", 1)
+
+    assert loader.invalidate(symbol="AAPL") == 1
+    assert redis_client.get(key) is None
+    assert redis_client.get(f"{key}:lock") == b"holder"
+    assert redis_client.exists(f"{key}:revalidating")
+
+
+def test_bulk_data_caches_fetched_symbols_when_a_later_request_fails(loader, redis_client, monkeypatch):
+    def failing_get(url, params=None, **kwargs):
+        if params["symbol"] == "FAIL":
+            return FakeResponse({}, status_code=500)
+        return FakeResponse({"symbol": params["symbol"]})
+
+    monkeypatch.setattr(loader.session, "get", failing_get)
+
+    with pytest.raises(ConnectionError):
+        loader.get_bulk_data(["AAPL", "MSFT", "FAIL"], function="TIME_SERIES_DAILY")
+    with pytest.raises(ConnectionError):
+        loader.warm([{"function": "OVERVIEW", "symbol": symbol} for symbol in ("AAPL", "FAIL")])
+
+    assert loader.cache_get_many([{"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": "full"}
+                                  for symbol in ("AAPL", "MSFT")]) == [{"symbol": "AAPL"}, {"symbol": "MSFT"}]
+    assert loader.cache_get_many([{"function": "OVERVIEW", "symbol": "AAPL"}]) == [{"symbol": "AAPL"}]
+
+
+def test_warm_returns_status_records_instead_of_payloads(loader, redis_client, api_calls):
+    cached = {"function": "GLOBAL_QUOTE", "symbol": "AAPL"}
+    missing = {"function": "GLOBAL_QUOTE", "symbol": "MSFT"}
+    loader.cache_set_many([(cached, {"cached": True})])
+
+    statuses = loader.warm([cached, missing])
+
+    assert [status["source"] for status in statuses] == ["cache", "api"]
+    assert [call["symbol"] for call in api_calls] == ["MSFT"]
+    for params, status in zip([cached, missing], statuses):
+        assert status["key"] == loader._generate_cache_key(params)
+        assert status["bytes"] == len(redis_client.get(status["key"]))
+        assert status["fetched_at"] <= time.time()
+
+    assert [status["source"] for status in loader.warm([cached], force=True)] == ["api"]
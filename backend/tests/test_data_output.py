@@ -0,0 +1,93 @@
+import json
+
+import pandas as pd
+import pytest
+
+from backend.src.data_output import DataOutput
+from backend.src.data_processor import DataProcessor
+from backend.tests.payloads import make_daily_payload
+
+
+@pytest.fixture
+def df():
+    processor = DataProcessor()
+    return processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=250))).sort_index()
+
+
+@pytest.fixture
+def output(tmp_path):
+    output = DataOutput(output_dir=str(tmp_path))
+    # Small chunks so the streaming writers go through several batches
+    output.CHUNK_SIZE = 64
+    return output
+
+
+def test_streaming_writers_keep_the_date_index(output, df):
+    paths = output.save_to_multiple_formats(df, "prices", formats=("json", "ndjson", "csv", "parquet"))
+
+    with open(paths["json"]) as f:
+        records = json.load(f)
+    assert len(records) == len(df)
+    assert records[0]["Date"].startswith(df.index[0].strftime("%Y-%m-%d"))
+
+    ndjson = pd.read_json(paths["ndjson"], lines=True)
+    assert len(ndjson) == len(df)
+    assert list(ndjson.columns) == ["Date"] + list(df.columns)
+
+    csv = pd.read_csv(paths["csv"], index_col=0, parse_dates=True)
+    pd.testing.assert_frame_equal(csv, df, check_freq=False, check_names=False)
+
+    parquet = pd.read_parquet(paths["parquet"]).set_index("Date")
+    pd.testing.assert_frame_equal(parquet, df, check_freq=False, check_names=False, check_index_type=False)
+
+
+def test_parquet_chunks_share_the_schema_of_the_whole_frame(output, df):
+    pytest.importorskip("pyarrow")
+    df = df.copy()
+    # Object columns whose first chunk is all missing or all whole numbers
+    df["Split"] = pd.Series([None] * 64 + [2.0] * (len(df) - 64), index=df.index, dtype=object)
+    df["Ratio"] = pd.Series([1] * 64 + [0.5] * (len(df) - 64), index=df.index, dtype=object)
+
+    parquet = pd.read_parquet(output.save_to_parquet(df, "prices.parquet")).set_index("Date")
+
+    assert parquet["Split"].iloc[-1] == 2.0 and parquet["Split"].isna().sum() == 64
+    assert parquet["Ratio"].tolist() == df["Ratio"].tolist()
+
+
+def test_multiple_formats_rejects_unknown_format(output, df):
+    with pytest.raises(ValueError):
+        output.save_to_multiple_formats(df, "prices", formats=("xml",))
+
+
+def test_constant_memory_excel_splits_long_frames(output, df):
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+    output.EXCEL_MAX_ROWS = 100
+    df = df.copy()
+    df.iloc[0, 0] = float("nan")
+
+    path = output.save_to_excel_bulk({"AAPL": df, "MSFT": df.iloc[:10]}, "bulk.xlsx")
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["AAPL", "AAPL (2)", "AAPL (3)", "MSFT"]
+    sheets = {name: pd.read_excel(path, sheet_name=name, index_col=0) for name in workbook.sheetnames}
+    combined = pd.concat([sheets["AAPL"], sheets["AAPL (2)"], sheets["AAPL (3)"]])
+    pd.testing.assert_frame_equal(combined, df, check_freq=False, check_names=False, check_index_type=False)
+
+
+def test_constant_memory_excel_blanks_infinities_and_fixes_sheet_names(output, df):
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+    df = df.iloc[:5].copy()
+    df.iloc[1, 0] = float("inf")
+    df.iloc[2, 1] = float("-inf")
+    long_name = "Alphabet Inc. Class A [GOOGL]: daily/weekly?"
+
+    path = output.save_to_excel_bulk({long_name: df, long_name.upper(): df, "'quoted'": df}, "names.xlsx")
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["Alphabet Inc. Class A _GOOGL__ ", "ALPHABET INC. CLASS A _GOOG (2)", "quoted"]
+    assert all(len(name) <= 31 for name in workbook.sheetnames)
+    sheet = pd.read_excel(path, sheet_name=0, index_col=0)
+    assert sheet.iloc[1, 0] != sheet.iloc[1, 0] and sheet.iloc[2, 1] != sheet.iloc[2, 1]
+    assert sheet.iloc[0, 0] == df.iloc[0, 0]
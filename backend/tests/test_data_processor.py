@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.data_processor import DataProcessor
+from backend.tests.payloads import make_daily_payload, make_income_statement_payload
+
+
+@pytest.fixture
+def processor():
+    return DataProcessor()
+
+
+def test_panel_metrics_match_per_symbol_processing(processor):
+    payloads = {symbol: make_daily_payload(seed=i) for i, symbol in enumerate(["AAPL", "MSFT", "GOOG"])}
+
+    panel = processor.calculate_panel_metrics(processor.build_panel(payloads, "Time Series (Daily)"), window=5)
+
+    for symbol, payload in payloads.items():
+        df = processor.clean_stock_data(processor.json_to_dataframe(payload, "Time Series (Daily)")).sort_index()
+        df = processor.calculate_moving_average(processor.calculate_returns(df), window=5)
+        split = processor.split_panel(panel)[symbol]
+        pd.testing.assert_frame_equal(split[df.columns], df, check_names=False, check_freq=False)
+
+
+def test_panel_cumulative_return_spans_missing_prices(processor):
+    panel = pd.concat({"Close": pd.DataFrame({"AAPL": [100.0, np.nan, 110.0, 121.0]},
+                                             index=pd.date_range("2024-01-01", periods=4))}, axis=1)
+
+    panel = processor.calculate_panel_metrics(panel, window=2)
+
+    np.testing.assert_allclose(panel[("Cumulative Return", "AAPL")], [np.nan, np.nan, 1.1, 1.21])
+    assert panel[("Daily Return", "AAPL")].isna().tolist() == [True, True, True, False]
+
+
+def test_parse_time_series_matches_json_to_dataframe(processor):
+    payload = make_daily_payload(days=300)
+
+    expected = processor.json_to_dataframe(payload, nested_key="Time Series (Daily)")
+    parsed = processor.parse_time_series(payload)
+
+    pd.testing.assert_frame_equal(parsed, expected)
+    assert parsed["5. volume"].dtype == np.int64
+
+
+def test_parse_reports_types_columns(processor):
+    df = processor.parse_reports(make_income_statement_payload(quarters=8), "quarterlyReports")
+
+    assert df.index.is_monotonic_increasing
+    assert df["totalRevenue"].dtype == np.float64
+    assert df["reportedCurrency"].iloc[0] == "USD"
+    assert df["netIncome"].isna().any()
+
+
+def test_parquet_history_store_reads_date_window_and_columns(processor, tmp_path):
+    pytest.importorskip("pyarrow")
+    from backend.src.history_store import ParquetHistoryStore
+
+    df = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=600))).sort_index()
+    store = ParquetHistoryStore(str(tmp_path))
+    store.save("AAPL", df)
+
+    window = store.read("AAPL", "2024-06-01", "2025-01-31", columns=["Close"])
+
+    assert sorted(name for name in (tmp_path / "symbol=AAPL").iterdir()) == [
+        tmp_path / "symbol=AAPL" / f"year={year}" for year in (2024, 2025, 2026)]
+    pd.testing.assert_frame_equal(window, processor.filter_by_date(df, "2024-06-01", "2025-01-31")[["Close"]],
+                                  check_freq=False)
+    assert store.last_date("AAPL") == df.index.max()
+    pd.testing.assert_frame_equal(store.load_tail("AAPL", 3), df.iloc[-3:], check_freq=False)
+    assert store.read("MSFT") is None
+
+
+def test_parquet_history_store_migrates_pickled_histories(processor, tmp_path):
+    pytest.importorskip("pyarrow")
+    from backend.src.history_store import HistoryStore, ParquetHistoryStore
+
+    df = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=400))).sort_index()
+    pickles = HistoryStore(str(tmp_path / "history"))
+    pickles.save("AAPL", df)
+    pickles.save("MSFT", df.iloc[:10])
+    store = ParquetHistoryStore(str(tmp_path / "history_parquet"))
+    store.save("MSFT", df.iloc[:5])
+
+    assert store.migrate(pickles) == ["AAPL"]
+    pd.testing.assert_frame_equal(store.load("AAPL"), df, check_freq=False)
+    assert len(store.load("MSFT")) == 5
+    assert store.migrate(pickles, overwrite=True) == ["AAPL", "MSFT"]
+    assert store.symbols() == ["AAPL", "MSFT"] and len(store.load("MSFT")) == 10
+
+
+def test_downsampling_keeps_shape_of_series(processor):
+    df = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=3000))).sort_index()
+    df.iloc[1234, df.columns.get_loc("Close")] = 1000.0
+
+    lttb = processor.downsample_lttb(df, 200)
+    assert len(lttb) == 200
+    assert lttb.index[0] == df.index[0] and lttb.index[-1] == df.index[-1]
+    assert lttb.index.is_monotonic_increasing
+    assert df.index[1234] in lttb.index
+
+    ohlc = processor.downsample_ohlc(df, 200)
+    assert len(ohlc) == 200
+    assert ohlc["High"].max() == df["High"].max() and ohlc["Low"].min() == df["Low"].min()
+    assert ohlc["Volume"].sum() == df["Volume"].sum()
+    assert ohlc["Open"].iloc[0] == df["Open"].iloc[0] and ohlc["Close"].iloc[-1] == df["Close"].iloc[-1]
+
+    window = processor.chart_series(df, "2025-01-01", "2025-12-31", points=50)
+    assert len(window) == 50 and window.index.min() >= pd.Timestamp("2025-01-01")
+    pd.testing.assert_frame_equal(processor.chart_series(df.iloc[:10], points=50), df.iloc[:10])
+
+
+def test_chart_series_are_cached_per_symbol_window_and_resolution(processor, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from backend.src.charts import ChartSeries
+    from backend.src.history_store import ParquetHistoryStore
+
+    store = ParquetHistoryStore(str(tmp_path))
+    store.save("AAPL", processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=2000))))
+    charts = ChartSeries(store)
+
+    series = charts.get("AAPL", "2025-01-01", points=100, columns=["Close"])
+    assert list(series.columns) == ["Close"] and len(series) == 100
+
+    monkeypatch.setattr(store, "read", lambda *args: pytest.fail("the store was read again"))
+    assert charts.get("AAPL", "2025-01-01", points=100, columns=["Close"]) is series
+
+
+def test_align_frames_matches_iterative_merge(processor):
+    frames = {symbol: processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=100 + i, seed=i)))
+              for i, symbol in enumerate(["AAPL", "MSFT", "GOOG"])}
+    with_column = [df.sort_index().add_prefix(f"{symbol}_").rename_axis("Date").reset_index()
+                   for symbol, df in frames.items()]
+    # The 'Date' column is not the first one: pd.merge keeps it where the first frame has it
+    with_column = [df[[df.columns[1], "Date", *df.columns[2:]]] for df in with_column]
+
+    expected = with_column[0]
+    for df in with_column[1:]:
+        expected = pd.merge(expected, df, on="Date", how="outer")
+
+    merged = processor.merge_data(with_column, how="outer")
+    pd.testing.assert_frame_equal(merged, expected)
+    assert list(merged.columns[:3]) == ["AAPL_Open", "Date", "AAPL_High"]
+    aligned = processor.align_frames(frames)
+    assert list(aligned.columns[:2]) == ["AAPL_Open", "AAPL_High"]
+    assert len(aligned) == 100 and not aligned.isna().any().any()
+    # Frames indexed by date (no 'Date' column) are joined on their index
+    by_index = [frames["AAPL"].sort_index(), frames["MSFT"].sort_index().add_suffix(" MSFT")]
+    pd.testing.assert_frame_equal(processor.merge_data(by_index), processor.align_frames(by_index))
+
+    with pytest.raises(ValueError):
+        processor.align_frames(list(frames.values()))
+
+
+def test_merge_data_keeps_pd_merge_semantics(processor):
+    left = pd.DataFrame({"Date": pd.to_datetime(["2024-01-02", "2024-01-02", "2024-01-03"]), "Close": [1.0, 2.0, 3.0]})
+    right = pd.DataFrame({"Date": pd.to_datetime(["2024-01-02", "2024-01-04"]), "Close": [4.0, 5.0]})
+
+    for how in ["inner", "outer", "left", "right"]:
+        pd.testing.assert_frame_equal(processor.merge_data([left, right], how=how),
+                                      pd.merge(left, right, on="Date", how=how))
+    assert list(processor.merge_data([left, right]).columns) == ["Date", "Close_x", "Close_y"]
+    assert processor.merge_data([left, right]).shape == (2, 3)
+
+
+def test_align_frames_carries_quarterly_values_onto_daily_dates(processor):
+    prices = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=300)))
+    reports = processor.parse_reports(make_income_statement_payload(quarters=12), "quarterlyReports")[["totalRevenue"]]
+
+    aligned = processor.align_frames({"AAPL": prices, "AAPL_Q": reports}, how="left", fill="ffill")
+
+    assert aligned.index.equals(prices.sort_index().index)
+    for date in ["2024-04-01", "2024-06-28", "2024-07-01"]:
+        assert aligned.loc[date, "AAPL_Q_totalRevenue"] == reports.loc[:date, "totalRevenue"].iloc[-1]
+
+    stale = processor.align_frames({"AAPL": prices, "AAPL_Q": reports}, how="left", fill="ffill", tolerance="30D")
+    assert np.isnan(stale.loc["2024-06-28", "AAPL_Q_totalRevenue"])
+
+
+def test_indicators_match_pandas_and_leave_input_unchanged(processor):
+    df = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=500))).sort_index()
+    original = df.copy()
+
+    result = processor.calculate_indicators(df, ["sma:20", "sma:50", "ema:12", "log_return", "volatility:20",
+                                                 "drawdown", "vwap", ("vwap", 10)])
+
+    pd.testing.assert_frame_equal(df, original)
+    log_returns = np.log(df["Close"] / df["Close"].shift())
+    typical = (df["High"] + df["Low"] + df["Close"]) / 3
+    expected = {
+        "SMA 20": df["Close"].rolling(20).mean(),
+        "SMA 50": df["Close"].rolling(50).mean(),
+        "EMA 12": df["Close"].ewm(span=12, adjust=False, min_periods=12).mean(),
+        "Log Return": log_returns,
+        "Volatility 20": log_returns.rolling(20).std(),
+        "Drawdown": df["Close"] / df["Close"].cummax() - 1,
+        "VWAP": (typical * df["Volume"]).cumsum() / df["Volume"].cumsum(),
+        "VWAP 10": (typical * df["Volume"]).rolling(10).sum() / df["Volume"].rolling(10).sum(),
+    }
+    for column, values in expected.items():
+        pd.testing.assert_series_equal(result[column], values, check_names=False, check_freq=False, rtol=1e-7)
+
+    with pytest.raises(ValueError):
+        processor.calculate_indicators(df, ["sma"])
+
+
+def test_downcast_halves_memory(processor):
+    df = processor.clean_stock_data(processor.parse_time_series(make_daily_payload(days=500))).sort_index()
+    df["Currency"] = "USD"
+
+    full = processor.calculate_indicators(df, ["sma:20", "drawdown"])
+    small = processor.calculate_indicators(df, ["sma:20", "drawdown"], downcast=True)
+
+    assert small["Close"].dtype == np.float32 and small["SMA 20"].dtype == np.float32
+    assert small["Volume"].dtype == np.int32
+    assert small["Currency"].dtype == "category"
+    assert small.memory_usage(deep=True).sum() < full.memory_usage(deep=True).sum() / 2
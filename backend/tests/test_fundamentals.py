@@ -0,0 +1,87 @@
+import json
+import time
+
+import fakeredis
+import numpy as np
+import pytest
+
+from backend.src.data_loader import DataLoader
+from backend.src.fundamentals import FundamentalsIndex, income_row
+from backend.tests.payloads import make_income_statement_payload
+from backend.tests.stub_server import FIXTURES_DIR
+
+
+def make_overview(symbol: str, rng: np.random.Generator) -> dict:
+    with open(f"{FIXTURES_DIR}/OVERVIEW.json") as f:
+        overview = json.load(f)
+    overview.update({"Symbol": symbol, "PERatio": f"{rng.uniform(5, 40):.2f}",
+                     "Sector": rng.choice(["TECHNOLOGY", "ENERGY", "FINANCE"]),
+                     "MarketCapitalization": str(int(rng.uniform(1e9, 1e12)))})
+    return overview
+
+
+@pytest.fixture
+def index():
+    loader = DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis())
+    rng = np.random.default_rng(0)
+    symbols = [f"T{i:04d}" for i in range(2000)]
+    index = FundamentalsIndex(loader)
+    index.update_many({symbol: make_overview(symbol, rng) for symbol in symbols},
+                      {symbol: make_income_statement_payload(quarters=8, seed=i, symbol=symbol)
+                       for i, symbol in enumerate(symbols)})
+    return index
+
+
+def test_screen_matches_pandas_filter(index):
+    table = index.table
+    expected = table[(table["PERatio"] < 15) & (table["RevenueGrowthYOY"] > 0.1) & (table["Sector"] == "TECHNOLOGY")]
+
+    start = time.perf_counter()
+    result = index.screen(["PERatio < 15", "RevenueGrowthYOY > 0.1", "Sector == TECHNOLOGY"])
+    assert time.perf_counter() - start < 0.1
+
+    assert list(result.index) == list(expected.index) and len(result)
+    top = index.screen(["Sector != ENERGY"], sort_by="MarketCapitalization", ascending=False, limit=5)
+    assert list(top.index) == list(table[table["Sector"] != "ENERGY"]["MarketCapitalization"].nlargest(5).index)
+
+    with pytest.raises(ValueError):
+        index.screen(["Unknown > 1"])
+
+
+def test_updates_from_cache_reach_other_processes(index):
+    reader = FundamentalsIndex(index.loader)
+    assert reader.table.loc["T0001", "PERatio"] != 3.0
+
+    overview = make_overview("T0001", np.random.default_rng(1))
+    overview["PERatio"] = "3.0"
+    index.loader.cache_set_many([({"function": "OVERVIEW", "symbol": "T0001"}, overview)])
+    index.refresh(["T0001"])
+
+    assert list(reader.screen(["PERatio <= 3"]).index) == ["T0001"]
+    assert reader.table.loc["T0001", "EarningsYield"] == pytest.approx(1 / 3)
+
+
+def test_income_row_ignores_loss_bases_and_gaps():
+    payload = make_income_statement_payload(quarters=8)
+    reports = payload["quarterlyReports"]
+    reports[4]["netIncome"] = "-100"
+    reports[0]["netIncome"] = "300"
+
+    row = income_row(payload)
+    assert np.isnan(row["NetIncomeGrowthYOY"])
+    assert row["RevenueTTMReported"] == sum(float(report["totalRevenue"]) for report in reports[:4])
+
+    # A missing quarter among the last four reports: the report four back is from five quarters earlier
+    del reports[2]
+    row = income_row(payload)
+    assert np.isnan(row["RevenueTTMReported"]) and np.isnan(row["NetMarginTTM"])
+    assert np.isnan(row["RevenueGrowthYOY"])
+    assert row["RevenueGrowthQOQ"] == float(reports[0]["totalRevenue"]) / float(reports[1]["totalRevenue"]) - 1
+
+
+def test_screen_on_empty_index_returns_no_rows():
+    index = FundamentalsIndex(DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis()))
+
+    result = index.screen(["PERatio < 15", "Sector == TECHNOLOGY"], sort_by="MarketCapitalization")
+
+    assert result.empty and "PERatio" in result.columns
@@ -0,0 +1,70 @@
+import fakeredis
+import pandas as pd
+import pytest
+
+from backend.src import history_store
+from backend.src.data_loader import DataLoader
+from backend.src.data_processor import DataProcessor
+from backend.src.incremental import IncrementalUpdater
+from backend.tests.payloads import make_daily_payload
+from backend.tests.stub_server import FakeResponse
+
+
+@pytest.fixture
+def processor():
+    return DataProcessor()
+
+
+@pytest.fixture
+def loader():
+    return DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis(), requests_per_minute=6000)
+
+
+@pytest.mark.parametrize("store_class, window", [("HistoryStore", 5), ("ParquetHistoryStore", 5), ("HistoryStore", 1)])
+def test_incremental_update_matches_full_recompute(processor, loader, tmp_path, store_class, window):
+    if store_class == "ParquetHistoryStore":
+        pytest.importorskip("pyarrow")
+
+    payload = make_daily_payload(days=205)
+    series = list(payload["Time Series (Daily)"].items())
+    requests = []
+
+    def fake_get(url, params=None, **kwargs):
+        requests.append(params["outputsize"])
+        if params["outputsize"] == "compact":
+            return FakeResponse({"Time Series (Daily)": dict(series[:100])})
+        # The first refresh only knew the first 200 days
+        return FakeResponse({"Time Series (Daily)": dict(series[5:])})
+
+    loader.session.get = fake_get
+    updater = IncrementalUpdater(loader, processor, getattr(history_store, store_class)(str(tmp_path)), window=window)
+    last_day = pd.Timestamp(series[0][0])
+
+    assert updater.update(["AAPL"], now=last_day) == {"AAPL": 200}
+    assert updater.update(["AAPL"], now=last_day) == {"AAPL": 5}
+    assert requests == ["full", "compact"]
+
+    expected = processor.clean_stock_data(processor.json_to_dataframe(payload, "Time Series (Daily)")).sort_index()
+    expected = processor.calculate_moving_average(processor.calculate_returns(expected), window=window)
+    pd.testing.assert_frame_equal(updater.store.load("AAPL"), expected)
+
+
+def test_incremental_update_reports_failed_symbols(processor, loader, tmp_path):
+    payload = make_daily_payload(days=30)
+
+    def fake_get(url, params=None, **kwargs):
+        if params["symbol"] == "DOWN":
+            return FakeResponse({}, status_code=503)
+        if params["symbol"] == "EMPTY":
+            return FakeResponse({"Time Series (Daily)": {}})
+        return FakeResponse(payload)
+
+    loader.session.get = fake_get
+    updater = IncrementalUpdater(loader, processor, history_store.HistoryStore(str(tmp_path)), window=5)
+
+    added = updater.update(["DOWN", "AAPL", "EMPTY", "MSFT"])
+
+    assert added["AAPL"] == added["MSFT"] == 30
+    assert isinstance(added["DOWN"], ConnectionError)
+    assert isinstance(added["EMPTY"], ValueError)
+    assert updater.store.load("DOWN") is None and len(updater.store.load("MSFT")) == 30
@@ -0,0 +1,65 @@
+import socket
+
+import fakeredis
+import pytest
+
+from backend.src.data_loader import DataLoader
+from backend.src.data_processor import DataProcessor
+from backend.src.metrics import InMemorySink, Metrics, PrometheusSink, StatsDSink, metrics
+from backend.tests.payloads import make_daily_payload
+from backend.tests.stub_server import AlphaVantageStub
+
+
+@pytest.fixture
+def sink():
+    previous = metrics.sink
+    sink = PrometheusSink()
+    metrics.set_sink(sink)
+    yield sink
+    metrics.set_sink(previous)
+
+
+def test_loader_and_processor_report_to_the_sink(sink):
+    with AlphaVantageStub() as stub:
+        loader = DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis(), requests_per_minute=6000,
+                            base_url=stub.url)
+        loader.get_bulk_data(["AAPL", "MSFT"], function="TIME_SERIES_DAILY")
+        loader.get_bulk_data(["AAPL", "MSFT"], function="TIME_SERIES_DAILY")
+
+    DataProcessor().parse_time_series(make_daily_payload())
+
+    assert sink.counter("cache_hits") == 2
+    assert sink.counter("cache_misses", function="TIME_SERIES_DAILY") == 2
+    assert sink.cache_hit_ratio() == 0.5
+    assert sink.histogram("api_latency_seconds")["count"] == 2
+    assert sink.histogram("rate_limit_wait_seconds")["count"] == 2
+    assert sink.counter("cache_bytes_written") > 0
+    assert sink.histogram("processor_stage_seconds", stage="parse_time_series")["count"] == 1
+
+    text = sink.render()
+    assert 'marketfundamentals_cache_hits_total{function="TIME_SERIES_DAILY",tier="redis"} 2' in text
+    assert 'marketfundamentals_api_latency_seconds_bucket{function="TIME_SERIES_DAILY",le="+Inf"} 2' in text
+
+
+def test_statsd_sink_sends_udp_datagrams():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2)
+    sink = StatsDSink(*receiver.getsockname(), prefix="mf")
+    statsd = Metrics(sink)
+
+    statsd.incr("cache_hits", function="OVERVIEW")
+    statsd.observe("api_latency_seconds", 0.25)
+
+    assert receiver.recv(1024) == b"mf.cache_hits:1|c|#function:OVERVIEW"
+    assert receiver.recv(1024) == b"mf.api_latency:250.000|ms"
+    sink.close()
+    receiver.close()
+
+
+def test_timer_records_duration():
+    sink = InMemorySink()
+    with Metrics(sink).timer("stage_seconds", stage="export"):
+        pass
+
+    assert sink.histogram("stage_seconds", stage="export")["count"] == 1
@@ -0,0 +1,111 @@
+import os
+
+import fakeredis
+import pandas as pd
+import pytest
+
+from backend.src.data_loader import DataLoader
+from backend.src.data_output import DataOutput
+from backend.src.data_processor import DataProcessor
+from backend.src.pipeline import Pipeline, PipelinePlan, prune_payload
+from backend.tests.payloads import make_daily_payload
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    loader = DataLoader(api_key="demo", redis_client=fakeredis.FakeRedis())
+    payloads = {symbol: make_daily_payload(days=500, seed=i, start="2022-01-03") for i, symbol in enumerate(SYMBOLS)}
+    loader.cache_set_many([({"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": "full"}, payload)
+                           for symbol, payload in payloads.items()])
+    monkeypatch.setattr(loader.session, "get", lambda *args, **kwargs: pytest.fail("unexpected API request"))
+    loader.payloads = payloads
+    return loader
+
+
+def expected_frame(payload: dict, start: str, end: str, indicators: list) -> pd.DataFrame:
+    processor = DataProcessor()
+    df = processor.clean_stock_data(processor.parse_time_series(payload)).sort_index()
+    df = processor.calculate_indicators(df, indicators)
+    return processor.filter_by_date(df, start, end)
+
+
+def test_prune_payload_keeps_window_lookback_and_fields(loader):
+    plan = PipelinePlan(start_date="2023-01-02", end_date="2023-03-31", columns=("Close",), indicators=("sma:20",))
+    nested_key, pruned = prune_payload(loader.payloads["AAA"], plan)
+
+    bars = pruned[nested_key]
+    dates = sorted(loader.payloads["AAA"][nested_key])
+    first = dates.index("2023-01-02")
+    assert list(bars) == dates[first - 20:dates.index("2023-03-31") + 1]
+    assert all(list(bar) == ["4. close"] for bar in bars.values())
+
+    assert prune_payload(loader.payloads["AAA"], PipelinePlan(start_date="2030-01-01")) == (None, None)
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_pipeline_matches_manual_chain(loader, processes):
+    indicators = ["sma:20", "volatility:10", "log_return"]
+    results = (Pipeline(loader)
+               .fetch(SYMBOLS, "TIME_SERIES_DAILY")
+               .between("2023-01-02", "2023-06-30")
+               .select(["Close", "Volume"])
+               .indicators(indicators)
+               .run(processes=processes))
+
+    assert sorted(results) == SYMBOLS
+    for symbol, df in results.items():
+        expected = expected_frame(loader.payloads[symbol], "2023-01-02", "2023-06-30", indicators)
+        pd.testing.assert_frame_equal(df, expected[["Close", "Volume", "SMA 20", "Volatility 10", "Log Return"]])
+
+
+def test_pipeline_uses_whole_history_for_path_dependent_indicators(loader):
+    indicators = ["ema:12", "drawdown", "vwap", "sma:5"]
+    plan = PipelinePlan(start_date="2023-01-02", indicators=tuple(indicators))
+    assert plan.lookback() is None
+    assert PipelinePlan(indicators=("vwap:20", "sma:5")).lookback() == 20
+
+    results = (Pipeline(loader)
+               .fetch(SYMBOLS, "TIME_SERIES_DAILY")
+               .between("2023-01-02", "2023-03-31")
+               .indicators(indicators)
+               .run(processes=0))
+
+    for symbol, df in results.items():
+        expected = expected_frame(loader.payloads[symbol], "2023-01-02", "2023-03-31", indicators)
+        pd.testing.assert_frame_equal(df, expected)
+
+
+def test_pipeline_reports_failed_symbols_and_completes_the_others(loader, tmp_path, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("API unreachable")
+
+    monkeypatch.setattr(loader.session, "get", unreachable)
+    output = DataOutput(output_dir=str(tmp_path))
+
+    results = Pipeline(loader, output).fetch(SYMBOLS + ["MISSING"]).export(["csv"]).run(processes=0)
+
+    assert sorted(results) == SYMBOLS + ["MISSING"]
+    assert isinstance(results["MISSING"], ConnectionError)
+    assert all(os.path.exists(results[symbol]["csv"]) for symbol in SYMBOLS)
+
+
+def test_pipeline_exports_each_symbol(loader, tmp_path):
+    output = DataOutput(output_dir=str(tmp_path))
+    pipeline = (Pipeline(loader, output)
+                .fetch(SYMBOLS + ["EMPTY"], "TIME_SERIES_DAILY")
+                .between("2023-01-02", "2023-01-31")
+                .export(["csv", "parquet"], prefix="daily_"))
+    loader.cache_set_many([({"function": "TIME_SERIES_DAILY", "symbol": "EMPTY", "outputsize": "full"},
+                            {"Meta Data": {}, "Time Series (Daily)": {}})])
+
+    results = pipeline.run(processes=0)
+
+    assert sorted(results) == SYMBOLS
+    for symbol, paths in results.items():
+        assert os.path.basename(paths["csv"]) == f"daily_{symbol}.csv"
+        assert len(pd.read_parquet(paths["parquet"])) == 22
+
+    with pytest.raises(ValueError):
+        Pipeline(loader).export(["csv"])
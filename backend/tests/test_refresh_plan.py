@@ -0,0 +1,51 @@
+import fakeredis
+import pytest
+
+from backend.src.refresh_plan import (FUNDAMENTALS_QUEUE, HOT_QUEUE, TIME_SERIES_QUEUE, RefreshProgress,
+                                      new_job_id, plan_refresh, request_params)
+
+
+def test_plan_refresh_chunks_watchlist_first():
+    chunks = plan_refresh(["aapl", "MSFT", "IBM", "NVDA", "AAPL"], "OVERVIEW", watchlist=["nvda"], chunk_size=2)
+
+    assert [chunk.symbols for chunk in chunks] == [["NVDA"], ["AAPL", "MSFT"], ["IBM"]]
+    assert [chunk.queue for chunk in chunks] == [HOT_QUEUE, FUNDAMENTALS_QUEUE, FUNDAMENTALS_QUEUE]
+    assert chunks[0].priority < chunks[1].priority
+
+
+def test_plan_refresh_routes_by_data_type():
+    assert {chunk.queue for chunk in plan_refresh(["AAPL"], "GLOBAL_QUOTE")} == {HOT_QUEUE}
+    assert {chunk.queue for chunk in plan_refresh(["AAPL"], "TIME_SERIES_DAILY")} == {TIME_SERIES_QUEUE}
+
+    with pytest.raises(ValueError):
+        plan_refresh(["AAPL"], "OVERVIEW", chunk_size=0)
+
+
+def test_request_params_match_loader_getters():
+    assert request_params("GLOBAL_QUOTE", "aapl") == {"function": "GLOBAL_QUOTE", "symbol": "AAPL"}
+    assert request_params("TIME_SERIES_DAILY", "AAPL")["outputsize"] == "full"
+
+
+def test_refresh_progress_survives_new_instances():
+    redis_client = fakeredis.FakeRedis()
+    RefreshProgress(redis_client, "OVERVIEW:2024-01-02").start(3)
+    RefreshProgress(redis_client, "OVERVIEW:2024-01-02").mark_done(["AAPL"])
+
+    progress = RefreshProgress(redis_client, "OVERVIEW:2024-01-02")
+    assert progress.pending(["AAPL", "MSFT", "IBM"]) == ["MSFT", "IBM"]
+    assert progress.status() == {"job_id": "OVERVIEW:2024-01-02", "done": 1, "total": 3}
+
+
+def test_new_run_refreshes_every_symbol_again():
+    redis_client = fakeredis.FakeRedis()
+    first, second = new_job_id("GLOBAL_QUOTE"), new_job_id("GLOBAL_QUOTE")
+    assert first != second and first.startswith("GLOBAL_QUOTE:")
+
+    RefreshProgress(redis_client, first).start(2)
+    RefreshProgress(redis_client, first).mark_done(["AAPL", "MSFT"])
+    RefreshProgress(redis_client, second).start(2)
+    assert RefreshProgress(redis_client, second).pending(["AAPL", "MSFT"]) == ["AAPL", "MSFT"]
+
+    # Starting a job again forgets its progress; only redelivered chunks resume
+    RefreshProgress(redis_client, first).start(2)
+    assert RefreshProgress(redis_client, first).status()["done"] == 0
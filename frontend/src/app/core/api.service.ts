@@ -1,7 +1,18 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 
+export interface SeriesOptions {
+  function?: string;
+  start?: string;
+  end?: string;
+  window?: number;
+  columns?: string[];
+  // Downsample each series to about this many points: 'lttb' for line charts, 'ohlc' for candlesticks
+  points?: number;
+  method?: 'lttb' | 'ohlc';
+}
+
 @Injectable({
   providedIn: 'root',
 })
@@ -17,4 +28,44 @@ export class ApiService {
   getReports(): Observable<any> {
     return this.http.get(`${this.baseUrl}/reports`);
   }
+
+  // Batched endpoints: one request for all the symbols of a view, keyed by symbol in the response
+
+  getQuotes(symbols: string[]): Observable<Record<string, any>> {
+    return this.http.get<Record<string, any>>(`${this.baseUrl}/quotes`, {
+      params: new HttpParams().set('symbols', symbols.join(',')),
+    });
+  }
+
+  getOverviews(symbols: string[], fields: string[] = []): Observable<Record<string, any>> {
+    let params = new HttpParams().set('symbols', symbols.join(','));
+    if (fields.length) {
+      params = params.set('fields', fields.join(','));
+    }
+    return this.http.get<Record<string, any>>(`${this.baseUrl}/overviews`, { params });
+  }
+
+  getSeries(symbols: string[], options: SeriesOptions = {}): Observable<Record<string, any>> {
+    let params = new HttpParams().set('symbols', symbols.join(','));
+    for (const [key, value] of Object.entries(options)) {
+      if (value !== undefined && value !== null) {
+        params = params.set(key, Array.isArray(value) ? value.join(',') : String(value));
+      }
+    }
+    return this.http.get<Record<string, any>>(`${this.baseUrl}/series`, { params });
+  }
+
+  getCharts(symbols: string[], options: Omit<SeriesOptions, 'function' | 'window'> = {}): Observable<Record<string, any>> {
+    let params = new HttpParams().set('symbols', symbols.join(','));
+    for (const [key, value] of Object.entries(options)) {
+      if (value !== undefined && value !== null) {
+        params = params.set(key, Array.isArray(value) ? value.join(',') : String(value));
+      }
+    }
+    return this.http.get<Record<string, any>>(`${this.baseUrl}/charts`, { params });
+  }
+
+  getSectors(): Observable<any> {
+    return this.http.get(`${this.baseUrl}/sectors`);
+  }
 }